@@ -2,12 +2,20 @@ from fastapi import FastAPI
 from app.routers.base_router import router as base_router
 from fastapi.middleware.cors import CORSMiddleware
 from app.dbconfig.database import engine, Base
+from app.dbconfig.query_profiler import QueryProfilerMiddleware, instrument_engine
 from app.models import item_model
 
 Base.metadata.create_all(bind=engine)
 
 app = FastAPI()
 
+instrument_engine(engine)
+
+# Per-route SQL query budgets; exceeding one is logged, or raised with QUERY_BUDGET_STRICT=true
+QUERY_BUDGETS = {}
+
+app.add_middleware(QueryProfilerMiddleware, budgets=QUERY_BUDGETS)
+
 origin = "http://localhost:3000"
 
 app.add_middleware(
@@ -1,5 +1,9 @@
-from app.dbconfig.database import SessionLocal
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app.dbconfig.database import SessionLocal, engine
 from app.models.role import Role
+from app.utils.role_registry import role_registry
+from app.logger.logger import logger
 
 def seed_roles():
     db = SessionLocal()
@@ -10,8 +14,19 @@ def seed_roles():
             Role(id = 2, name="user"),
         ])
     db.commit()
+    role_registry.load(db)
     db.close()
 
+def ensure_email_index():
+    """create_all skips indexes on existing tables, so add the normalized-email index here"""
+    # Raw DDL: expression indexes cannot be reflected, so Index.create(checkfirst=True) can't be used
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email_normalized ON users (lower(email))"))
+    except IntegrityError:
+        logger.error("Cannot create ix_users_email_normalized: users table has emails differing only in case")
+
 if __name__ == "__main__":
     seed_roles()
+    ensure_email_index()
     print("Roles seeded successfully.")
\ No newline at end of file
@@ -0,0 +1,44 @@
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+# Pragma profile applied to every new SQLite connection. WAL lets readers run
+# alongside the single writer, NORMAL sync drops the per-commit fsync of the
+# rollback journal, and busy_timeout makes writers wait instead of failing
+# with "database is locked". Each value can be overridden from the environment.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-20000")),  # negative = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict = None):
+    """Run the pragma profile on each connection the engine opens"""
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+    # Async engines emit pool events on their sync facade
+    target = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(target, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def create_sqlite_engine(database_url: str, pragmas: dict = None, **kwargs):
+    """create_engine() that applies the SQLite profile; other databases pass straight through"""
+    if make_url(database_url).get_backend_name() != "sqlite":
+        return create_engine(database_url, **kwargs)
+
+    connect_args = {"check_same_thread": False, **kwargs.pop("connect_args", {})}
+    engine = create_engine(database_url, connect_args=connect_args, **kwargs)
+    return apply_sqlite_pragmas(engine, pragmas)
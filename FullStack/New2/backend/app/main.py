@@ -1,19 +1,32 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from app.dbconfig.database import engine, Base
+from app.dbconfig.query_profiler import QueryProfilerMiddleware, instrument_engine
 from app.models.user import User
 from app.models.role import Role  # Import Role model
+from app.models.image_blob import ImageBlob
+from app.models.job import Job
 from app.routers.base_router import router
 from fastapi.middleware.cors import CORSMiddleware
+from app.utils.image_variants import shutdown_image_pool
+from app.utils.email_cache import email_cache, warm_email_cache, EMAIL_BLOOM_REFRESH_SECONDS
+from app.utils.job_queue import job_worker, JOB_WORKERS_IN_PROCESS
+from app.utils.metrics import MetricsMiddleware, metrics, metrics_endpoint, instrument_pool, register_caches
+import app.services.user_jobs  # Registers the job handlers
+from app.logger.logger import logger, dropped_log_records
+import asyncio
 import os
 
 app = FastAPI()
 
+instrument_engine(engine)
+
 Base.metadata.create_all(bind=engine)
 
 # Seed roles after creating tables
-from app.dbconfig.init_db import seed_roles
+from app.dbconfig.init_db import seed_roles, ensure_email_index
 seed_roles()
+ensure_email_index()
 
 # Create static directory if it doesn't exist
 static_dir = "static"
@@ -25,6 +38,41 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 
 app.include_router(router)
 
+async def refresh_email_cache_loop():
+    # Picks up signups handled by other worker processes
+    while True:
+        await asyncio.sleep(EMAIL_BLOOM_REFRESH_SECONDS)
+        try:
+            await asyncio.to_thread(warm_email_cache)
+        except Exception as e:
+            logger.error(f"Email availability filter refresh failed: {e}")
+
+@app.on_event("startup")
+async def start_email_cache():
+    await asyncio.to_thread(warm_email_cache)
+    if EMAIL_BLOOM_REFRESH_SECONDS > 0:
+        app.state.email_cache_task = asyncio.create_task(refresh_email_cache_loop())
+
+@app.on_event("startup")
+def start_job_workers():
+    if JOB_WORKERS_IN_PROCESS:
+        job_worker.start()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    # Before the image pool, which running variant jobs still use
+    job_worker.stop()
+
+@app.on_event("shutdown")
+def shutdown_image_workers():
+    shutdown_image_pool()
+
+@app.on_event("shutdown")
+async def stop_email_cache():
+    task = getattr(app.state, "email_cache_task", None)
+    if task:
+        task.cancel()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Role Management API"}
@@ -35,4 +83,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
+
+# Per-route SQL query budgets; exceeding one is logged, or raised with QUERY_BUDGET_STRICT=true
+QUERY_BUDGETS = {
+    "GET /users/check-email": 1,
+    "GET /users/list": 3,
+}
+
+app.add_middleware(QueryProfilerMiddleware, budgets=QUERY_BUDGETS)
+
+# Runtime metrics in Prometheus text format at /metrics
+instrument_pool(engine)
+register_caches({"email": email_cache.stats})
+metrics.gauge("jobs_completed_total", "Background jobs finished by this process",
+              lambda: job_worker.completed, metric_type="counter")
+metrics.gauge("jobs_retried_total", "Background job attempts that failed and were rescheduled",
+              lambda: job_worker.retried, metric_type="counter")
+metrics.gauge("jobs_failed_total", "Background jobs given up after their last attempt",
+              lambda: job_worker.failed, metric_type="counter")
+metrics.gauge("log_records_dropped_total", "Log records dropped because the log queue was full",
+              dropped_log_records, metric_type="counter")
+
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+app.add_middleware(MetricsMiddleware)
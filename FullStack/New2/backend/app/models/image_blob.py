@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+from app.dbconfig.database import Base
+
+class ImageBlob(Base):
+    __tablename__ = 'image_blobs'
+
+    digest = Column(String(64), primary_key=True)  # SHA-256 of the stored bytes
+    extension = Column(String(10), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.dbconfig.database import Base
 
@@ -16,4 +16,10 @@ class User(Base):
     role_id = Column(Integer, ForeignKey('roles.id'), nullable=False)
     is_active = Column(Boolean, default=True)
 
-    role = relationship("Role", back_populates="users")    
\ No newline at end of file
+    role = relationship("Role", back_populates="users")
+
+    # Emails are compared case-insensitively; this index backs those lookups
+    # and keeps "A@x.com" and "a@x.com" from both registering
+    __table_args__ = (
+        Index("ix_users_email_normalized", func.lower(email), unique=True),
+    )
@@ -1,6 +1,12 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator, computed_field
+from typing import Optional, Dict
 import re
+from app.utils.image_variants import variant_urls
+from app.utils.password_policy import password_policy
+
+_NAME_PATTERN = re.compile(r"^[a-zA-Z\s'-]+$")
+_NON_DIGITS = re.compile(r"\D")
+_INDIAN_MOBILE = re.compile(r"^[6-9]\d{9}$")
 
 class UserBase(BaseModel):
     first_name: str = Field(..., min_length=2, max_length=50, description="First name must be between 2 and 50 characters")
@@ -14,24 +20,25 @@ class UserBase(BaseModel):
     @field_validator('first_name', 'last_name')
     @classmethod
     def validate_names(cls, v):
-        if not v.strip():
+        v = v.strip()
+        if not v:
             raise ValueError('Name cannot be empty or just whitespace')
-        if not re.match(r"^[a-zA-Z\s'-]+$", v.strip()):
+        if not _NAME_PATTERN.match(v):
             raise ValueError('Name can only contain letters, spaces, hyphens, and apostrophes')
-        return v.strip().title()
+        return v.title()
 
     @field_validator('contact_number')
     @classmethod
     def validate_contact_number(cls, v):
         if v is not None:
-            # Remove all non-digit characters
-            digits_only = re.sub(r'\D', '', v)
+            # Remove all non-digit characters (already-clean numbers skip the regex)
+            digits_only = v if v.isdigit() else _NON_DIGITS.sub('', v)
             
             # Only accept exactly 10 digits starting with 6, 7, 8, or 9
             if len(digits_only) != 10:
                 raise ValueError('Contact number must be exactly 10 digits')
             
-            if not re.match(r'^[6-9]\d{9}$', digits_only):
+            if not _INDIAN_MOBILE.match(digits_only):
                 raise ValueError('Indian mobile number must start with 6, 7, 8, or 9')
             
             return digits_only
@@ -55,25 +62,9 @@ class UserCreate(UserBase):
     @field_validator('password')
     @classmethod
     def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('Password must be at least 8 characters long')
-        if len(v) > 128:
-            raise ValueError('Password must not exceed 128 characters')
-        
-        # Check password strength
-        if not re.search(r'[A-Z]', v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not re.search(r'[a-z]', v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        if not re.search(r'\d', v):
-            raise ValueError('Password must contain at least one number')
-        if not re.search(r'[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]', v):
-            raise ValueError('Password must contain at least one special character')
-        
-        # Check for common patterns
-        if v.lower() in ['password', '12345678', 'qwerty123', 'admin123']:
-            raise ValueError('Password is too common, please choose a stronger password')
-        
+        message = password_policy.check(v)
+        if message:
+            raise ValueError(message)
         return v
 
 class UserUpdate(UserBase):
@@ -110,6 +101,23 @@ class UserRead(UserBase):
     class Config:
         from_attributes = True
 
+    @classmethod
+    def from_trusted(cls, user) -> "UserRead":
+        """Build from a stored user without re-running the field validators.
+
+        Rows were validated when they were written, so reads skip that cost.
+        """
+        role = user.role
+        return cls.model_construct(
+            **{name: getattr(user, name) for name in cls.model_fields if name != "role"},
+            role=RoleRead.model_construct(id=role.id, name=role.name) if role else None
+        )
+
+    @computed_field
+    @property
+    def profile_pic_variants(self) -> Optional[Dict[str, str]]:
+        return variant_urls(self.profile_pic)
+
 class UserListResponse(BaseModel):
     id: int
     first_name: str
@@ -124,6 +132,17 @@ class UserListResponse(BaseModel):
     class Config:
         from_attributes = True
 
+    @classmethod
+    def from_trusted(cls, row: dict) -> "UserListResponse":
+        """Build from a projected users row (role as an id/name dict) without validation"""
+        role = row.get("role")
+        return cls.model_construct(**{**row, "role": RoleRead.model_construct(**role) if role else None})
+
+    @computed_field
+    @property
+    def profile_pic_variants(self) -> Optional[Dict[str, str]]:
+        return variant_urls(self.profile_pic)
+
 class UserProfileResponse(BaseModel):
     message: str
     user: UserRead
@@ -136,6 +155,9 @@ class UsersListResponse(BaseModel):
     message: str
     users: list[UserListResponse]
     total_count: int
+    limit: int
+    offset: int = 0
+    next_cursor: Optional[str] = None
 
 class RoleUpdateResponse(BaseModel):
     message: str
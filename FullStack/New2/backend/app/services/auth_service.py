@@ -1,19 +1,25 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.utils.auth import hash_password, verify_password, create_access_token
 from app.utils.file_utils import save_base64_image
+from app.utils.base64_stream import parse_data_url
+from app.utils.email_cache import email_cache, normalize_email
+from app.services.user_jobs import enqueue_profile_variants, enqueue_user_event
 from app.schemas.auth import SignupRequest, LoginRequest, TokenResponse, SignupResponse
 from fastapi import HTTPException, status
 from app.logger.logger import logger
 
 
 def signup_user(db: Session, user_data: SignupRequest):
-    user_exists = db.query(User).filter(User.email == user_data.email).first()
+    user_exists = db.query(User.id).filter(func.lower(User.email) == normalize_email(user_data.email)).first()
     if user_exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
+    if user_data.profile_pic:
+        parse_data_url(user_data.profile_pic)  # Fail fast, before hashing or writing the user
     hashed_password = hash_password(user_data.password)
     
     # Create user first to get user ID
@@ -28,22 +34,23 @@ def signup_user(db: Session, user_data: SignupRequest):
         role_id=user_data.role_id,
         is_active=True
     )
-    logger.info(f"Registering new user: {new_user.email}")
+    logger.info("Registering new user: %s", new_user.email)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    db.flush()  # Assigns the user ID; everything below commits together
     
     # Handle profile picture if provided
     if user_data.profile_pic:
         try:
-            profile_pic_path = save_base64_image(user_data.profile_pic, new_user.id)
-            if profile_pic_path:
-                new_user.profile_pic = profile_pic_path
-                db.commit()
-                db.refresh(new_user)
+            new_user.profile_pic = save_base64_image(user_data.profile_pic, new_user.id, db)
+            enqueue_profile_variants(db, new_user.profile_pic)
         except Exception as e:
             logger.warning(f"Failed to save profile picture for user {new_user.email}: {e}")
             # Continue without profile picture rather than failing the signup
+
+    enqueue_user_event(db, "user.created", new_user)
+    db.commit()
+    db.refresh(new_user)
+    email_cache.add(new_user.email)
     
     return SignupResponse(
         message="User registered successfully",
@@ -64,6 +71,6 @@ def login_user(db: Session, login_data: LoginRequest):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is inactive"
         )
-    logger.info(f"User {user.email} trying to log in")
+    logger.info("User %s trying to log in", user.email)
     access_token = create_access_token(data={"sub":user.email, "role_id": user.role_id})
     return TokenResponse(access_token=access_token, token_type="bearer")
\ No newline at end of file
@@ -0,0 +1,81 @@
+import json
+import os
+import urllib.request
+from typing import Optional
+from uuid import uuid4
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.utils.blob_store import blob_path, parse_blob_url
+from app.utils.file_utils import delete_profile_image
+from app.utils.image_variants import generate_variants_in_pool
+from app.utils.job_queue import enqueue_job, job_handler
+from app.logger.logger import logger
+
+# Side effects of user writes. The services enqueue these in the write's own
+# transaction and return once it commits; the job queue runs them afterwards.
+PROFILE_VARIANTS_JOB = "profile_image_variants"
+DELETE_PROFILE_FILE_JOB = "delete_profile_file"
+USER_EVENT_JOB = "user_event"
+
+# POST target for user events (JSON body); events are only logged when unset
+USER_EVENT_WEBHOOK_URL = os.getenv("USER_EVENT_WEBHOOK_URL", "")
+USER_EVENT_WEBHOOK_TIMEOUT = float(os.getenv("USER_EVENT_WEBHOOK_TIMEOUT", "5"))
+
+
+def enqueue_profile_variants(db: Session, profile_pic: Optional[str]):
+    """Queue thumbnail generation for a blob-store picture; each image is processed once"""
+    parsed = parse_blob_url(profile_pic)
+    if parsed:
+        digest, extension = parsed
+        enqueue_job(db, PROFILE_VARIANTS_JOB, {"digest": digest, "extension": extension},
+                    idempotency_key=f"variants:{digest}")
+
+
+def release_profile_image(db: Session, user: User):
+    """Let go of user's current picture: blobs lose user's reference now, legacy files are deleted after commit"""
+    profile_pic = user.profile_pic
+    if not profile_pic:
+        return
+    if parse_blob_url(profile_pic):
+        delete_profile_image(profile_pic, db, holder_id=user.id)
+    else:
+        enqueue_job(db, DELETE_PROFILE_FILE_JOB, {"path": profile_pic})
+
+
+def enqueue_user_event(db: Session, event: str, user: User):
+    # event_id lets the receiver drop deliveries repeated by retries
+    payload = {"event_id": uuid4().hex, "event": event, "user_id": user.id, "email": user.email}
+    enqueue_job(db, USER_EVENT_JOB, payload)
+
+
+@job_handler(PROFILE_VARIANTS_JOB)
+def generate_profile_variants(db: Session, payload: dict):
+    source_path = blob_path(payload["digest"], payload["extension"])
+    if not os.path.exists(source_path):
+        # Already garbage-collected: nobody references the image any more
+        logger.info("Skipping variants for removed blob %s", payload['digest'][:12])
+        return
+    generate_variants_in_pool(source_path, payload["digest"], raise_errors=True)
+
+
+@job_handler(DELETE_PROFILE_FILE_JOB)
+def delete_profile_file(db: Session, payload: dict):
+    # Legacy paths were client-supplied; keep a file another user still shows
+    if db.query(User.id).filter(User.profile_pic == payload["path"]).first() is None:
+        delete_profile_image(payload["path"])
+
+
+@job_handler(USER_EVENT_JOB)
+def deliver_user_event(db: Session, payload: dict):
+    if not USER_EVENT_WEBHOOK_URL:
+        logger.info("User event %s for user %s", payload['event'], payload['user_id'])
+        return
+    request = urllib.request.Request(
+        USER_EVENT_WEBHOOK_URL,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Idempotency-Key": payload["event_id"]},
+        method="POST"
+    )
+    # Non-2xx responses raise, so the job is retried
+    with urllib.request.urlopen(request, timeout=USER_EVENT_WEBHOOK_TIMEOUT):
+        pass
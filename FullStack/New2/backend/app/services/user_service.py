@@ -1,67 +1,100 @@
+from typing import Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
-from app.schemas.user import UserBase, UserCreate, UserPartialUpdate, UserProfileResponse, UserUpdateResponse, UsersListResponse, UserListResponse, RoleUpdateResponse
+from app.schemas.user import UserBase, UserRead, UserCreate, UserPartialUpdate, UserProfileResponse, UserUpdateResponse, UsersListResponse, UserListResponse, RoleUpdateResponse
 from app.models.user import User
 from app.models.role import Role
 from app.utils.auth import hash_password
-from app.utils.file_utils import save_base64_image, delete_profile_image
+from app.utils.role_registry import role_registry
+from app.utils.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor, compute_etag, etag_matches
+from app.utils.file_utils import save_base64_image
+from app.utils.base64_stream import parse_data_url
+from app.utils.email_cache import email_cache, normalize_email
+from app.services.user_jobs import enqueue_profile_variants, release_profile_image, enqueue_user_event
 from fastapi import HTTPException, status
-import app.logger.logger as logger
+from app.logger.logger import logger
 
 def get_me(user: User):
     return UserProfileResponse(
         message="User profile retrieved successfully",
-        user=user
+        user=UserRead.from_trusted(user)
     )
 
 def check_email_availability(db: Session, email: str) -> bool:
     """
     Check if an email address is available for registration.
     Returns True if email is available, False if already taken.
+    Most answers come from the in-process cache; db is only queried on a miss.
     """
     if not email or not email.strip():
         return False
     
     # Normalize email (lowercase and trim)
-    normalized_email = email.strip().lower()
+    normalized_email = normalize_email(email)
+
+    cached = email_cache.lookup(normalized_email)
+    if cached is not None:
+        return cached
     
-    # Check if email already exists in database
-    existing_user = db.query(User).filter(User.email == normalized_email).first()
+    # Check if email already exists in database (served by ix_users_email_normalized)
+    existing_user = db.query(User.id).filter(func.lower(User.email) == normalized_email).first()
     
     # Return True if no user found (email is available)
-    return existing_user is None
+    available = existing_user is None
+    email_cache.store(normalized_email, available)
+    return available
 
-def update_profile(db: Session, user: User, user_update: UserPartialUpdate):
-    # Handle profile picture update if provided
-    if hasattr(user_update, 'profile_pic') and user_update.profile_pic is not None:
-        # If it's base64 data, save it as a file
-        if user_update.profile_pic.startswith('data:image/'):
-            # Delete old profile picture if it exists
-            if user.profile_pic:
-                delete_profile_image(user.profile_pic)
-            
-            # Save new profile picture
-            try:
-                new_profile_pic_path = save_base64_image(user_update.profile_pic, user.id)
-                user_update.profile_pic = new_profile_pic_path
-            except Exception as e:
-                logger.warning(f"Failed to save profile picture for user {user.email}: {e}")
-                user_update.profile_pic = None
-    
-    # Update other fields
-    for key, value in user_update.model_dump(exclude_unset=True).items():
+def _apply_profile_pic(db: Session, user: User, profile_pic: Optional[str]):
+    """Replace the user's picture, keeping blob references balanced.
+
+    Only data URLs are stored (the blob store takes a reference for them), an
+    empty value clears the picture, and the current value is a no-op; any other
+    path is rejected, so a user can never point at, or release, an image they
+    do not hold a reference to.
+    """
+    if profile_pic == user.profile_pic:
+        return
+    if not profile_pic:
+        release_profile_image(db, user)
+        user.profile_pic = None
+        return
+    if not profile_pic.startswith('data:image/'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Profile picture must be a base64 image data URL"
+        )
+    # Rejects oversize or malformed payloads before touching storage; a failed
+    # save raises, so the request fails and the current picture is kept
+    parse_data_url(profile_pic)
+    new_profile_pic_path = save_base64_image(profile_pic, user.id, db)
+    # Release the old picture in the same transaction; thumbnails and file
+    # deletion run as jobs once it commits
+    release_profile_image(db, user)
+    enqueue_profile_variants(db, new_profile_pic_path)
+    user.profile_pic = new_profile_pic_path
+
+def _apply_user_update(db: Session, user: User, user_update: UserPartialUpdate):
+    update_data = user_update.model_dump(exclude_unset=True)
+    if "profile_pic" in update_data:
+        _apply_profile_pic(db, user, update_data.pop("profile_pic"))
+    for key, value in update_data.items():
         setattr(user, key, value)
+
+def update_profile(db: Session, user: User, user_update: UserPartialUpdate):
+    _apply_user_update(db, user, user_update)
+    enqueue_user_event(db, "user.profile_updated", user)
     
     db.commit()
     db.refresh(user)
 
     return UserUpdateResponse(
         message="Profile updated successfully",
-        user=user
+        user=UserRead.from_trusted(user)
     )
 
 def create_user(db: Session, user_create: UserCreate):
     # Validate role exists
-    role = db.query(Role).filter(Role.id == user_create.role_id).first()
+    role = role_registry.get_by_id(user_create.role_id)
     if not role:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -69,7 +102,7 @@ def create_user(db: Session, user_create: UserCreate):
         )
     
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_create.email).first()
+    existing_user = db.query(User.id).filter(func.lower(User.email) == normalize_email(user_create.email)).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -81,28 +114,31 @@ def create_user(db: Session, user_create: UserCreate):
     password = user_data.pop('password')  # Remove plain password
     user_data['password_hash'] = hash_password(password)  # Add hashed password
     profile_pic_data = user_data.pop('profile_pic', None)  # Extract profile pic data
+    if profile_pic_data and profile_pic_data.startswith('data:image/'):
+        parse_data_url(profile_pic_data)  # Fail fast, before the user row is written
     
-    # Create user first to get user ID
+    # Flush for the user ID, then write the user, picture reference and jobs in one commit
     new_user = User(**user_data, profile_pic=None)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    db.flush()
     
     # Handle profile picture if provided
     if profile_pic_data and profile_pic_data.startswith('data:image/'):
         try:
-            profile_pic_path = save_base64_image(profile_pic_data, new_user.id)
-            if profile_pic_path:
-                new_user.profile_pic = profile_pic_path
-                db.commit()
-                db.refresh(new_user)
+            new_user.profile_pic = save_base64_image(profile_pic_data, new_user.id, db)
+            enqueue_profile_variants(db, new_user.profile_pic)
         except Exception as e:
             logger.warning(f"Failed to save profile picture for user {new_user.email}: {e}")
 
-    logger.info(f"User {new_user.email} created successfully")
+    enqueue_user_event(db, "user.created", new_user)
+    db.commit()
+    db.refresh(new_user)
+    email_cache.add(new_user.email)
+
+    logger.info("User %s created successfully", new_user.email)
     return UserProfileResponse(
         message="User created successfully",
-        user=new_user
+        user=UserRead.from_trusted(new_user)
     )
 
 def update_user(db: Session, user_id: int, user_update: UserPartialUpdate):
@@ -113,27 +149,74 @@ def update_user(db: Session, user_id: int, user_update: UserPartialUpdate):
             detail="User not found"
         )
     
-    for key, value in user_update.model_dump(exclude_unset=True).items():
-        setattr(user, key, value)
+    _apply_user_update(db, user, user_update)
     
     db.commit()
     db.refresh(user)
 
-    logger.info(f"User {user.email} updated successfully")
+    logger.info("User %s updated successfully", user.email)
     return UserUpdateResponse(
         message="User updated successfully",
-        user=user
+        user=UserRead.from_trusted(user)
     )   
 
-def list_all_users(db: Session):
-    users = db.query(User).options(joinedload(User.role)).all()
+def list_all_users(db: Session, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0,
+                   cursor: Optional[str] = None, if_none_match: Optional[str] = None):
+    """
+    Return one page of users ordered by id, plus the page's ETag.
+    A cursor (keyset) takes precedence over offset. The page is None when
+    if_none_match shows the client already has this exact page.
+    """
+    after_id = decode_cursor(cursor)
+
+    # Plain column rows; no ORM objects are built for the listing
+    query = (
+        db.query(
+            User.id, User.first_name, User.last_name, User.email, User.contact_number,
+            User.address, User.profile_pic, User.is_active,
+            Role.id.label("role_id"), Role.name.label("role_name")
+        )
+        .outerjoin(Role, User.role_id == Role.id)
+        .order_by(User.id)
+    )
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+    elif offset:
+        query = query.offset(offset)
+
+    # One extra row tells us whether another page follows
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    rows = rows[:limit]
+    total_count = db.query(func.count(User.id)).scalar()
+
+    etag = compute_etag(total_count, next_cursor, [tuple(row) for row in rows])
+    if etag_matches(etag, if_none_match):
+        return None, etag
+
+    users = []
+    for row in rows:
+        user = row._asdict()
+        role_id, role_name = user.pop("role_id"), user.pop("role_name")
+        user["role"] = {"id": role_id, "name": role_name} if role_id is not None else None
+        users.append(UserListResponse.from_trusted(user))
+
     return UsersListResponse(
         message="Users retrieved successfully",
-        users=[UserListResponse.model_validate(user) for user in users],
-        total_count=len(users)
-    )
+        users=users,
+        total_count=total_count,
+        limit=limit,
+        offset=offset if after_id is None else 0,
+        next_cursor=next_cursor
+    ), etag
 
 def update_user_role(db: Session, user_id: int, role_id: int):
+    if role_registry.get_by_id(role_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Role with id {role_id} does not exist"
+        )
+
     user = db.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
@@ -145,8 +228,8 @@ def update_user_role(db: Session, user_id: int, role_id: int):
     db.commit()
     db.refresh(user)
 
-    logger.info(f"User {user.email} role updated successfully")
+    logger.info("User %s role updated successfully", user.email)
     return RoleUpdateResponse(
         message="User role updated successfully",
-        user=user
+        user=UserRead.from_trusted(user)
     )
\ No newline at end of file
@@ -0,0 +1,117 @@
+import base64
+import binascii
+import hashlib
+import os
+import re
+from typing import Optional, Tuple
+from uuid import uuid4
+from fastapi import HTTPException, status
+
+PROFILE_PIC_MAX_BYTES = int(os.getenv("PROFILE_PIC_MAX_BYTES", str(5 * 1024 * 1024)))
+
+# Base64 characters read per step; any partial 4-character group is carried to the next
+DECODE_CHUNK_CHARS = 64 * 1024
+
+# Line breaks and other whitespace (e.g. 76-column MIME wrapping) are ignored
+_WHITESPACE = re.compile(r"\s+")
+
+_DATA_URL_HEADER = re.compile(r"data:(image/[a-z0-9.+-]+)?(?:;[a-z0-9=.-]+)*?;base64,", re.IGNORECASE)
+
+# Magic bytes -> (mime type, stored extension)
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png", "png"),
+    (b"\xff\xd8\xff", "image/jpeg", "jpg"),
+    (b"GIF87a", "image/gif", "gif"),
+    (b"GIF89a", "image/gif", "gif"),
+)
+
+_MIME_ALIASES = {"image/jpg": "image/jpeg", "image/pjpeg": "image/jpeg"}
+
+
+def sniff_image_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """Identify an image from its leading bytes; returns (mime, extension) or None"""
+    for signature, mime, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return mime, extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    return None
+
+
+def parse_data_url(data: str, max_bytes: Optional[int] = None) -> Tuple[Optional[str], int]:
+    """Validate the data-URL header and size without decoding anything.
+
+    Returns the declared MIME type (None for bare base64) and the offset where
+    the payload starts. Oversize payloads are rejected from their length alone.
+    """
+    max_bytes = max_bytes or PROFILE_PIC_MAX_BYTES
+    declared_mime, start = None, 0
+    if data.startswith("data:"):
+        match = _DATA_URL_HEADER.match(data, 0, 256)
+        if not match or not match.group(1):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Profile picture must be a base64 image data URL")
+        declared_mime, start = match.group(1).lower(), match.end()
+
+    # Every 4 base64 characters carry 3 bytes
+    payload_chars = len(data) - start
+    if payload_chars // 4 * 3 - 2 > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image exceeds the maximum size of {max_bytes} bytes"
+        )
+    return _MIME_ALIASES.get(declared_mime, declared_mime), start
+
+
+def decode_data_url_to_file(data: str, directory: str, max_bytes: Optional[int] = None) -> Tuple[str, str, str, int]:
+    """Decode a base64 image data URL to a temp file in bounded chunks.
+
+    The first chunk is sniffed before the rest is decoded, so non-images are
+    rejected early; at most DECODE_CHUNK_CHARS of decoded data is held at once.
+    Returns (temp_path, sha256 hex digest, extension, size in bytes); the
+    caller owns temp_path and must move or remove it.
+    """
+    declared_mime, start = parse_data_url(data, max_bytes)
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{uuid4().hex}.part")
+
+    digest = hashlib.sha256()
+    size = 0
+    extension = None
+    try:
+        with open(temp_path, "wb") as out:
+            pending = ""
+            for offset in range(start, len(data), DECODE_CHUNK_CHARS):
+                encoded = pending + _WHITESPACE.sub("", data[offset:offset + DECODE_CHUNK_CHARS])
+                usable = len(encoded) - len(encoded) % 4
+                pending = encoded[usable:]
+                if not usable:
+                    continue
+                chunk = base64.b64decode(encoded[:usable], validate=True)
+                if extension is None:
+                    sniffed = sniff_image_type(chunk)
+                    if sniffed is None or (declared_mime and declared_mime != sniffed[0]):
+                        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported or mismatched image type")
+                    extension = sniffed[1]
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        if pending:
+            raise binascii.Error("Incomplete base64 group")
+        if extension is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Image data is empty")
+    except (binascii.Error, ValueError):
+        _remove_quietly(temp_path)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid base64 image data")
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+
+    return temp_path, digest.hexdigest(), extension, size
+
+
+def _remove_quietly(path: str):
+    # The temp file may never have been created, e.g. if open() itself failed
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,155 @@
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.image_blob import ImageBlob
+from app.models.user import User
+from app.logger.logger import logger
+
+# Blobs live at blobs/<d[0:2]>/<d[2:4]>/<digest>.<ext> so no directory grows past
+# a few hundred entries, however many images are stored.
+BLOB_ROOT = os.path.join("static", "profile_pics", "blobs")
+BLOB_URL_PREFIX = "/static/profile_pics/blobs/"
+
+# Files written but never referenced (e.g. the request failed after the write),
+# and blobs whose last reference went away, are only swept once they have been
+# idle this long, so an upload reusing the blob meanwhile keeps its file.
+BLOB_GC_GRACE_SECONDS = int(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+
+_BLOB_URL_PATTERN = re.compile(r"^/static/profile_pics/blobs/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.([a-z0-9]+)$")
+
+
+def _relative_path(digest: str, extension: str) -> str:
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+
+def blob_path(digest: str, extension: str) -> str:
+    return os.path.join(BLOB_ROOT, *_relative_path(digest, extension).split("/"))
+
+
+def blob_url(digest: str, extension: str) -> str:
+    return f"{BLOB_URL_PREFIX}{_relative_path(digest, extension)}"
+
+
+def parse_blob_url(url: Optional[str]):
+    """Return (digest, extension) for a blob-store URL, or None for anything else"""
+    match = _BLOB_URL_PATTERN.match(url or "")
+    return (match.group(1), match.group(2)) if match else None
+
+
+def write_blob(digest: str, extension: str, data: bytes) -> str:
+    """Write the bytes once; an existing blob with the same digest is reused"""
+    path = blob_path(digest, extension)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.part"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    return path
+
+
+def store_blob_file(temp_path: str, digest: str, extension: str) -> str:
+    """Move an already-written temp file into place, or drop it if the blob exists"""
+    path = blob_path(digest, extension)
+    if os.path.exists(path):
+        os.remove(temp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+    return path
+
+
+def add_blob_reference(db: Session, digest: str, extension: str, size_bytes: int):
+    """Count one more reference to a blob inside the caller's transaction"""
+    updated = (
+        db.query(ImageBlob)
+        .filter(ImageBlob.digest == digest)
+        .update({ImageBlob.ref_count: ImageBlob.ref_count + 1}, synchronize_session=False)
+    )
+    if updated:
+        return
+    try:
+        with db.begin_nested():
+            db.add(ImageBlob(digest=digest, extension=extension, size_bytes=size_bytes, ref_count=1))
+    except IntegrityError:
+        # Another request registered the same blob first
+        db.query(ImageBlob).filter(ImageBlob.digest == digest).update(
+            {ImageBlob.ref_count: ImageBlob.ref_count + 1}, synchronize_session=False
+        )
+
+
+def release_blob_reference(db: Session, url: Optional[str], holder_id: Optional[int] = None) -> bool:
+    """Drop one reference to the blob behind url; files are removed by the GC sweep.
+
+    With holder_id, the reference is only dropped while the blob has more
+    references than the other users showing it, so it can never take one
+    another user holds.
+    """
+    parsed = parse_blob_url(url)
+    if parsed is None:
+        return False
+    conditions = [ImageBlob.digest == parsed[0], ImageBlob.ref_count > 0]
+    if holder_id is not None:
+        other_holders = (
+            db.query(func.count(User.id))
+            .filter(User.profile_pic == url, User.id != holder_id)
+            .scalar_subquery()
+        )
+        conditions.append(ImageBlob.ref_count > other_holders)
+    updated = (
+        db.query(ImageBlob)
+        .filter(*conditions)
+        .update({ImageBlob.ref_count: ImageBlob.ref_count - 1}, synchronize_session=False)
+    )
+    return bool(updated)
+
+
+def sweep_unreferenced_blobs(db: Session, grace_seconds: int = BLOB_GC_GRACE_SECONDS) -> int:
+    """Delete blobs nobody references, plus stray files that never got a row"""
+    removed = 0
+    # updated_at is stored in UTC by the database's now()
+    row_cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=grace_seconds)
+    idle = (ImageBlob.ref_count <= 0, ImageBlob.updated_at < row_cutoff)
+    for digest, extension in db.query(ImageBlob.digest, ImageBlob.extension).filter(*idle).all():
+        # Re-checked in the DELETE: a reference taken since the scan keeps the blob
+        deleted = (
+            db.query(ImageBlob)
+            .filter(ImageBlob.digest == digest, *idle)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        if not deleted:
+            continue
+        try:
+            os.remove(blob_path(digest, extension))
+        except FileNotFoundError:
+            pass
+        removed += 1
+
+    known = {digest for (digest,) in db.query(ImageBlob.digest).all()}
+    cutoff = time.time() - grace_seconds
+    for directory, _, filenames in os.walk(BLOB_ROOT):
+        for filename in filenames:
+            digest = filename.split(".", 1)[0]
+            path = os.path.join(directory, filename)
+            if digest in known or os.path.getmtime(path) > cutoff:
+                continue
+            os.remove(path)
+            removed += 1
+
+    logger.info("Blob GC removed %s unreferenced images", removed)
+    return removed
+
+
+if __name__ == "__main__":
+    from app.dbconfig.database import SessionLocal
+    db = SessionLocal()
+    try:
+        print(f"Removed {sweep_unreferenced_blobs(db)} unreferenced images.")
+    finally:
+        db.close()
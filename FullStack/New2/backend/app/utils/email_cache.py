@@ -0,0 +1,144 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.logger.logger import logger
+
+EMAIL_BLOOM_CAPACITY = int(os.getenv("EMAIL_BLOOM_CAPACITY", "100000"))
+EMAIL_BLOOM_ERROR_RATE = float(os.getenv("EMAIL_BLOOM_ERROR_RATE", "0.01"))
+EMAIL_BLOOM_REFRESH_SECONDS = int(os.getenv("EMAIL_BLOOM_REFRESH_SECONDS", "300"))
+EMAIL_CACHE_TTL_SECONDS = float(os.getenv("EMAIL_CACHE_TTL_SECONDS", "30"))
+EMAIL_CACHE_MAX_ENTRIES = int(os.getenv("EMAIL_CACHE_MAX_ENTRIES", "50000"))
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; no false negatives, ~error_rate false positives"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        # Double hashing: two 64-bit halves of one digest generate all k positions
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class EmailAvailabilityCache:
+    """Answers "is this email taken?" without the database where it safely can.
+
+    Emails absent from the Bloom filter are definitely free. Bloom hits are
+    confirmed against the database once and the answer kept in a TTL + LRU
+    cache. The filter is per process, so a signup handled by another worker
+    only shows up after the next rebuild or the entry's TTL; the unique
+    index still guards the signup itself.
+    """
+
+    def __init__(self, max_entries: int = EMAIL_CACHE_MAX_ENTRIES, ttl: float = EMAIL_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._bloom = None
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        # One list per rebuild in progress, collecting emails added during its scan
+        self._rebuild_logs = []
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, email: str) -> Optional[bool]:
+        """True/False if availability is known without the database, else None"""
+        with self._lock:
+            entry = self._results.get(email)
+            if entry is not None:
+                available, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self._results.move_to_end(email)
+                    self.hits += 1
+                    return available
+                del self._results[email]
+            if self._bloom is not None and email not in self._bloom:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return None
+
+    def store(self, email: str, available: bool):
+        with self._lock:
+            self._results[email] = (available, time.monotonic() + self.ttl)
+            self._results.move_to_end(email)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def add(self, email: str):
+        """Record a newly registered email"""
+        email = normalize_email(email)
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(email)
+            for added in self._rebuild_logs:
+                added.append(email)
+            self._results.pop(email, None)
+        self.store(email, False)
+
+    def warm(self, db: Session) -> int:
+        """Rebuild the filter from the users table and swap it in"""
+        added = []
+        with self._lock:
+            self._rebuild_logs.append(added)
+        try:
+            total = db.query(func.count(User.id)).scalar() or 0
+            bloom = BloomFilter(max(EMAIL_BLOOM_CAPACITY, total * 2), EMAIL_BLOOM_ERROR_RATE)
+            for (email,) in db.query(func.lower(User.email)).yield_per(5000):
+                bloom.add(email)
+        except BaseException:
+            with self._lock:
+                self._rebuild_logs.remove(added)
+            raise
+        with self._lock:
+            self._rebuild_logs.remove(added)
+            # Signups recorded while the table was being scanned may be missing from it
+            for email in added:
+                bloom.add(email)
+            self._bloom = bloom
+            # Cached "available" answers may predate signups seen by the new filter
+            self._results = OrderedDict((key, entry) for key, entry in self._results.items() if not entry[0])
+        logger.info("Email availability filter loaded with %s addresses", total)
+        return total
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._results), "hits": self.hits, "misses": self.misses,
+                    "bloom_loaded": self._bloom is not None}
+
+
+email_cache = EmailAvailabilityCache()
+
+
+def warm_email_cache():
+    from app.dbconfig.database import SessionLocal
+    db = SessionLocal()
+    try:
+        return email_cache.warm(db)
+    finally:
+        db.close()
@@ -1,52 +1,46 @@
 import os
-import base64
-import uuid
 from typing import Optional
 from fastapi import HTTPException
+from sqlalchemy.orm import Session
 from app.logger.logger import logger
+from app.utils.base64_stream import decode_data_url_to_file
+from app.utils.blob_store import BLOB_ROOT, store_blob_file, add_blob_reference, release_blob_reference, blob_url, parse_blob_url
 
-def save_base64_image(base64_data: str, user_id: int) -> Optional[str]:
+def save_base64_image(base64_data: str, user_id: int, db: Session) -> Optional[str]:
+    """Store an image in the content-addressed blob store and take a reference to it.
+
+    The payload is decoded to disk in chunks, never as one bytes object. The
+    reference is added to db's transaction, so it only counts once the caller
+    commits; identical images are written to disk only once. Thumbnails are
+    left to the caller (see app.services.user_jobs).
+    """
     if not base64_data:
         return None
         
     try:
-        # Extract the base64 data and file extension
-        if ',' in base64_data:
-            header, base64_content = base64_data.split(',', 1)
-            # Extract file extension from header (e.g., "data:image/png;base64" -> "png")
-            if 'image/' in header:
-                file_ext = header.split('image/')[1].split(';')[0]
-            else:
-                file_ext = 'jpg'  # default
-        else:
-            base64_content = base64_data
-            file_ext = 'jpg'  # default
-            
-        # Generate unique filename
-        filename = f"profile_{user_id}_{uuid.uuid4().hex[:8]}.{file_ext}"
-        
-        # Create static directory if it doesn't exist
-        static_dir = os.path.join("static", "profile_pics")
-        os.makedirs(static_dir, exist_ok=True)
-        
-        # Full file path
-        file_path = os.path.join(static_dir, filename)
-        
-        # Decode and save the image
-        image_data = base64.b64decode(base64_content)
-        with open(file_path, 'wb') as f:
-            f.write(image_data)
-            
+        temp_path, digest, file_ext, size = decode_data_url_to_file(base64_data, BLOB_ROOT)
+
+        # Keep one file per distinct image, then count this user's reference
+        store_blob_file(temp_path, digest, file_ext)
+        add_blob_reference(db, digest, file_ext, size)
+        logger.info("Stored profile image %s for user %s", digest[:12], user_id)
+
         # Return relative path for database storage
-        return f"/static/profile_pics/{filename}"
-        
+        return blob_url(digest, file_ext)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error saving image: {e}")
         raise HTTPException(status_code=400, detail="Invalid image data")
 
-def delete_profile_image(file_path: str) -> bool:
+def delete_profile_image(file_path: str, db: Optional[Session] = None, holder_id: Optional[int] = None) -> bool:
     if not file_path:
         return False
+
+    # Blob-store images may be shared; drop our reference and leave the file to GC
+    if parse_blob_url(file_path):
+        return db is not None and release_blob_reference(db, file_path, holder_id)
         
     try:
         # Convert relative path to absolute path
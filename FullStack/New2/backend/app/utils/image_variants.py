@@ -0,0 +1,141 @@
+import io
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from app.logger.logger import logger
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional; without it only the original is stored
+    Image = None
+
+VARIANT_SIZES = (64, 128, 512)
+VARIANT_FORMAT = os.getenv("PROFILE_VARIANT_FORMAT", "WEBP").upper()
+VARIANT_QUALITY = int(os.getenv("PROFILE_VARIANT_QUALITY", "80"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+VARIANTS_DIR = os.path.join("static", "profile_pics", "variants")
+VARIANTS_URL_PREFIX = "/static/profile_pics/variants/"
+
+# Stored originals carry the SHA-256 of their bytes in the filename
+_DIGEST_PATTERN = re.compile(r"([0-9a-f]{64})(?:\.[A-Za-z0-9]+)?$")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Digests whose thumbnails are all on disk. Variants are never deleted, so a
+# digest only needs its files checked until they first show up.
+_ready_digests = set()
+_READY_CACHE_SIZE = 10000
+
+
+def _variant_extension() -> str:
+    if VARIANT_FORMAT == "WEBP" and Image is not None and features.check("webp"):
+        return "webp"
+    return "jpg"
+
+
+def variant_filename(digest: str, size: int) -> str:
+    return f"{digest}_{size}.{_variant_extension()}"
+
+
+def digest_from_path(path: Optional[str]) -> Optional[str]:
+    if not path:
+        return None
+    match = _DIGEST_PATTERN.search(os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def variants_ready(digest: str, output_dir: str = VARIANTS_DIR) -> bool:
+    if digest in _ready_digests:
+        return True
+    if not all(os.path.exists(os.path.join(output_dir, variant_filename(digest, size))) for size in VARIANT_SIZES):
+        return False
+    if len(_ready_digests) >= _READY_CACHE_SIZE:
+        _ready_digests.clear()
+    _ready_digests.add(digest)
+    return True
+
+
+def variant_urls(profile_pic: Optional[str]) -> Optional[Dict[str, str]]:
+    """Map each thumbnail size to its URL once they have been generated.
+
+    Until then (or if generation failed) this is None and clients show the original.
+    """
+    digest = digest_from_path(profile_pic)
+    if digest is None or Image is None or not variants_ready(digest):
+        return None
+    return {str(size): f"{VARIANTS_URL_PREFIX}{variant_filename(digest, size)}" for size in VARIANT_SIZES}
+
+
+def generate_variants(source_path: str, digest: str, output_dir: str = VARIANTS_DIR) -> Dict[int, str]:
+    """Write resized, re-encoded, EXIF-free thumbnails of source_path.
+
+    Output names depend only on the source content, so identical uploads share
+    one set of variants and re-running is a no-op. Runs inside worker processes.
+    """
+    if Image is None:
+        return {}
+
+    os.makedirs(output_dir, exist_ok=True)
+    extension = _variant_extension()
+    save_format = "WEBP" if extension == "webp" else "JPEG"
+    generated = {}
+
+    with Image.open(source_path) as original:
+        # Apply the camera orientation before the EXIF block is dropped
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if save_format == "WEBP" and image.mode in ("RGBA", "LA", "P") else "RGB")
+
+        for size in VARIANT_SIZES:
+            filename = variant_filename(digest, size)
+            target = os.path.join(output_dir, filename)
+            generated[size] = filename
+            if os.path.exists(target):
+                continue
+
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            # No exif= argument, so no metadata is carried into the variant
+            thumbnail.save(buffer, format=save_format, quality=VARIANT_QUALITY, optimize=True)
+
+            temp_path = f"{target}.{os.getpid()}.part"
+            with open(temp_path, "wb") as out:
+                out.write(buffer.getvalue())
+            os.replace(temp_path, target)
+
+    return generated
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+        return _pool
+
+
+def generate_variants_in_pool(source_path: str, digest: str, timeout: float = 30,
+                              raise_errors: bool = False) -> Dict[int, str]:
+    """Generate the thumbnails on the image worker pool; failures are logged, or raised if asked"""
+    if Image is None:
+        logger.warning("Pillow is not installed; skipping profile picture variants")
+        return {}
+    try:
+        return _get_pool().submit(generate_variants, source_path, digest).result(timeout=timeout)
+    except Exception as e:
+        if raise_errors:
+            raise
+        logger.error(f"Failed to generate variants for {source_path}: {e}")
+        return {}
+
+
+def shutdown_image_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+from sqlalchemy import and_, event, func, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.job import Job
+from app.logger.logger import logger
+
+# Durable queue for side effects of user writes. Jobs are inserted in the
+# same transaction as the write that causes them, so they exist exactly when
+# that write commits, and are drained by worker threads (or a separate
+# process) that retry failures with exponential backoff. Delivery is
+# at-least-once: handlers must be safe to run again.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Set to false when a separate `python -m app.utils.job_queue` process runs the jobs
+JOB_WORKERS_IN_PROCESS = os.getenv("JOB_WORKERS_IN_PROCESS", "true").lower() == "true"
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+# A job still running after this long is assumed lost with its worker and run again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+# Done and failed jobs are kept this long, which is also how long idempotency keys are remembered
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+# Modules that register handlers; imported by a standalone worker process
+JOB_HANDLER_MODULES = ("app.services.user_jobs",)
+
+_handlers: Dict[str, Callable[[Session, dict], None]] = {}
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def job_handler(kind: str):
+    """Register func(db, payload) to run jobs of this kind.
+
+    Database changes made through db are committed together with the job's
+    completion, so they are applied exactly once even if the job reruns.
+    """
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def enqueue_job(db: Session, kind: str, payload: dict, idempotency_key: Optional[str] = None,
+                delay_seconds: float = 0, max_attempts: int = JOB_MAX_ATTEMPTS) -> bool:
+    """Add a job to db's transaction; returns False if idempotency_key is already queued or done.
+
+    A job that failed for good under the same key is re-armed, so the work is tried again.
+    """
+    values = dict(
+        kind=kind,
+        payload=json.dumps(payload),
+        status="pending",
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=utcnow() + timedelta(seconds=delay_seconds),
+    )
+    statement = sqlite_insert(Job).values(idempotency_key=idempotency_key, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=["idempotency_key"],
+        set_=dict(values, locked_at=None, last_error=None, updated_at=func.now()),
+        where=Job.status == "failed",
+    )
+    added = db.execute(statement).rowcount > 0
+    if added:
+        db.info["jobs_enqueued"] = True
+    return added
+
+
+class JobWorker:
+    """Threads that claim and run due jobs.
+
+    A job is claimed with a conditional UPDATE, so any number of threads and
+    processes can share the table. Failures are retried after
+    JOB_RETRY_BASE_SECONDS * 2^(attempt - 1) and left as failed, with the
+    last error, once max_attempts is reached.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, poll_seconds: float = JOB_POLL_SECONDS):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._threads = []
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._last_prune = 0.0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopping.clear()
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Started %s job workers", self.workers)
+
+    def stop(self, timeout: float = 10):
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            # Cleared before looking for work, so a notify() that arrives meanwhile is kept
+            self._wake.clear()
+            try:
+                ran = self.run_once()
+            except Exception as e:
+                logger.error(f"Job worker error: {e}")
+                ran = False
+            if not ran:
+                self._wake.wait(self.poll_seconds)
+
+    def run_once(self) -> bool:
+        """Claim and run one due job; False when there was nothing to do"""
+        from app.dbconfig.database import SessionLocal
+        db = SessionLocal()
+        try:
+            job = self._claim(db)
+            if job is None:
+                self._prune(db)
+                return False
+            self._execute(db, job)
+            return True
+        finally:
+            db.close()
+
+    def _claim(self, db: Session) -> Optional[Job]:
+        now = utcnow()
+        due = or_(
+            and_(Job.status == "pending", Job.run_after <= now),
+            and_(Job.status == "running", Job.locked_at < now - timedelta(seconds=JOB_LEASE_SECONDS)),
+        )
+        candidate = db.query(Job.id).filter(due).order_by(Job.run_after, Job.id).first()
+        if candidate is None:
+            return None
+        claimed = (
+            db.query(Job)
+            .filter(Job.id == candidate.id, due)
+            .update({Job.status: "running", Job.locked_at: now, Job.attempts: Job.attempts + 1},
+                    synchronize_session=False)
+        )
+        db.commit()
+        # Another worker may have taken it between the two statements
+        return db.get(Job, candidate.id) if claimed else None
+
+    def _execute(self, db: Session, job: Job):
+        handler = _handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind {job.kind}")
+            handler(db, json.loads(job.payload))
+            job.status = "done"
+            job.last_error = None
+            db.commit()
+            self.completed += 1
+            return
+        except Exception as e:
+            db.rollback()
+            error = f"{type(e).__name__}: {e}"
+
+        job = db.get(Job, job.id)
+        job.last_error = error[:2000]
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+            self.failed += 1
+            logger.error(f"Job {job.id} ({job.kind}) failed after {job.attempts} attempts: {error}")
+        else:
+            delay = JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+            job.status = "pending"
+            job.run_after = utcnow() + timedelta(seconds=delay)
+            self.retried += 1
+            logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+        db.commit()
+
+    def _prune(self, db: Session):
+        # At most once every ten minutes, from whichever worker is idle
+        if time.monotonic() - self._last_prune < 600:
+            return
+        self._last_prune = time.monotonic()
+        now = utcnow()
+        removed = (
+            db.query(Job)
+            .filter(Job.status.in_(("done", "failed")),
+                    Job.updated_at < now - timedelta(seconds=JOB_RETENTION_SECONDS))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        if removed:
+            logger.info("Pruned %s finished jobs", removed)
+
+    def stats(self) -> dict:
+        return {"workers": len(self._threads), "completed": self.completed,
+                "retried": self.retried, "failed": self.failed}
+
+
+job_worker = JobWorker()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers_after_commit(session):
+    # Jobs only become visible to workers once the enqueuing transaction commits
+    if session.info.pop("jobs_enqueued", False):
+        job_worker.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_enqueued_flag(session):
+    session.info.pop("jobs_enqueued", None)
+
+
+if __name__ == "__main__":
+    import importlib
+
+    for module in JOB_HANDLER_MODULES:
+        importlib.import_module(module)
+    # Handlers registered on the imported module, not on this __main__ copy of it
+    worker = importlib.import_module("app.utils.job_queue").job_worker
+    worker.start()
+    print(f"Running {worker.workers} job workers; press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop()
@@ -0,0 +1,265 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from starlette.requests import Request
+from starlette.responses import Response
+from app.dbconfig.query_profiler import route_template
+
+# Prometheus text-format metrics without a client library. Request series are
+# created once per route, on its first request, and then only updated in
+# place; gauges backed by callbacks (pools, caches) are read at scrape time.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Requests that matched no route share one series, and methods outside the
+# standard set share one label, so clients cannot add series at will
+UNMATCHED_ROUTE = "unmatched"
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+OTHER_METHOD = "other"
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() only increments preallocated slots.
+
+    Request series are only updated from the event loop. Histograms observed
+    from worker threads (e.g. pool checkouts) are created with thread_safe=True.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Sequence[float], thread_safe: bool = False):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock() if thread_safe else None
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        if self._lock is None:
+            self._record(index, value)
+        else:
+            with self._lock:
+                self._record(index, value)
+
+    def _record(self, index: int, value: float):
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: Sequence[Tuple[str, str]]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels([*labels, ('le', repr(bound))])} {cumulative}")
+        lines.append(f"{name}_bucket{_labels([*labels, ('le', '+Inf')])} {self.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+
+class RouteSeries:
+    """Everything recorded for one (method, route) pair"""
+
+    __slots__ = ("labels", "status_counts", "latency")
+
+    def __init__(self, method: str, route: str):
+        self.labels = (("method", method), ("route", route))
+        self.status_counts = [0] * len(_STATUS_CLASSES)
+        self.latency = Histogram(LATENCY_BUCKETS)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._routes: Dict[Tuple[str, int], RouteSeries] = {}
+        self._histograms: Dict[Tuple[str, tuple], Tuple[str, Histogram]] = {}
+        self._gauges: List[Tuple[str, str, str, Optional[str], Callable[[], object]]] = []
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def route_series(self, scope) -> RouteSeries:
+        route = scope.get("route")
+        # A route also matches other methods (and answers 405), so map unknown tokens everywhere
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else OTHER_METHOD
+        # Routes live as long as the app and are not hashable, so key on identity
+        key = (method, id(route))
+        series = self._routes.get(key)
+        if series is None:
+            with self._lock:
+                series = self._routes.get(key)
+                if series is None:
+                    name = route_template(scope) if route is not None else UNMATCHED_ROUTE
+                    series = self._routes[key] = RouteSeries(method, name)
+        return series
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float],
+                  labels: Tuple[Tuple[str, str], ...] = (), thread_safe: bool = True) -> Histogram:
+        with self._lock:
+            key = (name, labels)
+            if key not in self._histograms:
+                self._histograms[key] = (help_text, Histogram(buckets, thread_safe))
+            return self._histograms[key][1]
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], object], label: Optional[str] = None,
+              metric_type: str = "gauge"):
+        """Register a value read at scrape time; with a label, read() returns {label value: number}"""
+        self._gauges.append((name, help_text, metric_type, label, read))
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total Requests handled, by method, route and status class",
+            "# TYPE http_requests_total counter",
+        ]
+        routes = list(self._routes.values())
+        for series in routes:
+            for status_class, count in zip(_STATUS_CLASSES, series.status_counts):
+                if count:
+                    lines.append(f"http_requests_total{_labels([*series.labels, ('status', status_class)])} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency, by method and route",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for series in routes:
+            lines += series.latency.render("http_request_duration_seconds", series.labels)
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+
+        described = set()
+        for (name, labels), (help_text, histogram) in sorted(self._histograms.items()):
+            if name not in described:
+                described.add(name)
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            lines += histogram.render(name, labels)
+
+        for name, help_text, metric_type, label, read in self._gauges:
+            try:
+                value = read()
+            except Exception:
+                # A failing source must not take the whole scrape down
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+            if label:
+                lines += [f"{name}{_labels([(label, key)])} {_format_value(item)}" for key, item in value.items()]
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route"""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        registry = self.registry
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.in_flight -= 1
+            series = registry.route_series(scope)
+            series.status_counts[min(max(status_code // 100, 1), 5) - 1] += 1
+            series.latency.observe(elapsed)
+
+
+_pools = {}
+
+
+def instrument_pool(engine, name: str = "default", registry: MetricsRegistry = metrics):
+    """Time how long connection checkouts wait on the engine's pool.
+
+    SQLAlchemy has no event before a checkout starts, so the pool's _do_get is
+    wrapped; call again after engine.dispose(), which replaces the pool.
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    pool = engine.pool
+    if getattr(pool, "_metrics_wrapped", False):
+        return engine
+    wait = registry.histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a database connection",
+                              POOL_WAIT_BUCKETS, labels=(("pool", name),))
+    do_get = pool._do_get
+
+    def timed_do_get():
+        started = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            wait.observe(time.perf_counter() - started)
+
+    pool._do_get = timed_do_get
+    pool._metrics_wrapped = True
+
+    if hasattr(pool, "checkedout"):
+        if not _pools:
+            registry.gauge("db_pool_checked_out", "Database connections currently checked out",
+                           lambda: {pool_name: engine.pool.checkedout() for pool_name, engine in _pools.items()},
+                           label="pool")
+        _pools[name] = engine
+    return engine
+
+
+def register_caches(caches: Dict[str, Callable[[], dict]], registry: MetricsRegistry = metrics):
+    """Export hits, misses and hit ratio for caches exposing stats() -> {"hits", "misses", ...}"""
+    def read(key):
+        return lambda: {name: stats()[key] for name, stats in caches.items()}
+
+    def hit_ratio():
+        ratios = {}
+        for name, stats in caches.items():
+            values = stats()
+            lookups = values["hits"] + values["misses"]
+            ratios[name] = values["hits"] / lookups if lookups else 0.0
+        return ratios
+
+    registry.gauge("cache_hits_total", "Cache lookups answered from the cache", read("hits"), label="cache",
+                   metric_type="counter")
+    registry.gauge("cache_misses_total", "Cache lookups that fell through", read("misses"), label="cache",
+                   metric_type="counter")
+    registry.gauge("cache_hit_ratio", "Share of lookups answered from the cache", hit_ratio, label="cache")
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
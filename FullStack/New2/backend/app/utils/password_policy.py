@@ -0,0 +1,150 @@
+import hashlib
+import mmap
+import os
+import string
+import sys
+from typing import Optional
+
+# Common/breached passwords are stored as sorted 8-byte hashes of the
+# lowercased password. A large list (millions of entries) is built once with
+#     python -m app.utils.password_policy build wordlist.txt common_passwords.bin
+# and pointed to by COMMON_PASSWORDS_FILE; it is mmap'd and binary-searched,
+# so it costs no Python objects per entry. Without it the small seed list
+# shipped next to this module is used.
+COMMON_PASSWORDS_FILE = os.getenv("COMMON_PASSWORDS_FILE", "")
+COMMON_PASSWORDS_SEED = os.path.join(os.path.dirname(__file__), "common_passwords.txt")
+_HASH_BYTES = 8
+
+SPECIAL_CHARACTERS = "!@#$%^&*()_+-=[]{};':\"\\|,.<>/?"
+
+_UPPER, _LOWER, _DIGIT, _SPECIAL = "U", "L", "D", "S"
+
+# One str.translate pass maps every ASCII character to its class marker
+_CLASS_TABLE = str.maketrans({
+    **{c: _UPPER for c in string.ascii_uppercase},
+    **{c: _LOWER for c in string.ascii_lowercase},
+    **{c: _DIGIT for c in string.digits},
+    **{c: _SPECIAL for c in SPECIAL_CHARACTERS},
+})
+
+
+def _password_hash(password: str) -> bytes:
+    return hashlib.blake2b(password.lower().encode("utf-8"), digest_size=_HASH_BYTES).digest()
+
+
+class CommonPasswordSet:
+    """Membership test over a sorted file of fixed-size password hashes"""
+
+    def __init__(self, path: str = COMMON_PASSWORDS_FILE, seed_path: str = COMMON_PASSWORDS_SEED):
+        self._map = None
+        self._count = 0
+        self._seed = frozenset()
+        if path and os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._count = len(self._map) // _HASH_BYTES
+        elif os.path.exists(seed_path):
+            with open(seed_path, encoding="utf-8") as f:
+                self._seed = frozenset(_password_hash(line.strip()) for line in f if line.strip())
+
+    def _hash_at(self, index: int) -> bytes:
+        offset = index * _HASH_BYTES
+        return self._map[offset:offset + _HASH_BYTES]
+
+    def __contains__(self, password: str) -> bool:
+        target = _password_hash(password)
+        if self._map is None:
+            return target in self._seed
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._hash_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self._count and self._hash_at(low) == target
+
+    def __len__(self) -> int:
+        return self._count if self._map is not None else len(self._seed)
+
+
+def build_common_password_file(wordlist_path: str, output_path: str) -> int:
+    """Write the sorted, de-duplicated hash file for a newline-separated wordlist"""
+    with open(wordlist_path, encoding="utf-8", errors="ignore") as f:
+        hashes = sorted({_password_hash(line.strip()) for line in f if line.strip()})
+    with open(output_path, "wb") as out:
+        for value in hashes:
+            out.write(value)
+    return len(hashes)
+
+
+class PasswordPolicy:
+    """Configurable password rules, checked in a single pass over the password.
+
+    check() returns the message for the first rule that fails, or None.
+    """
+
+    def __init__(self, min_length: int = 8, max_length: Optional[int] = None, require_upper: bool = True,
+                 require_lower: bool = True, require_digit: bool = True, require_special: bool = False,
+                 reject_common: bool = True, common_passwords: Optional[CommonPasswordSet] = None):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.reject_common = reject_common
+        self._common_passwords = common_passwords
+        self._required = [
+            (marker, message) for enabled, marker, message in (
+                (require_upper, _UPPER, "Password must contain at least one uppercase letter"),
+                (require_lower, _LOWER, "Password must contain at least one lowercase letter"),
+                (require_digit, _DIGIT, "Password must contain at least one number"),
+                (require_special, _SPECIAL, "Password must contain at least one special character"),
+            ) if enabled
+        ]
+
+    @property
+    def common_passwords(self) -> CommonPasswordSet:
+        # Opened on first use so importing the policy never touches the disk
+        if self._common_passwords is None:
+            self._common_passwords = CommonPasswordSet()
+        return self._common_passwords
+
+    def _classes(self, password: str) -> set:
+        classes = set(password.translate(_CLASS_TABLE))
+        if not password.isascii():
+            # Non-ASCII letters and digits still count towards their class
+            for c in password:
+                if c.isupper():
+                    classes.add(_UPPER)
+                elif c.islower():
+                    classes.add(_LOWER)
+                elif c.isdigit():
+                    classes.add(_DIGIT)
+        return classes
+
+    def check(self, password: str) -> Optional[str]:
+        if len(password) < self.min_length:
+            return f"Password must be at least {self.min_length} characters long"
+        if self.max_length is not None and len(password) > self.max_length:
+            return f"Password must not exceed {self.max_length} characters"
+
+        classes = self._classes(password)
+        for marker, message in self._required:
+            if marker not in classes:
+                return message
+
+        if self.reject_common and password in self.common_passwords:
+            return "Password is too common, please choose a stronger password"
+        return None
+
+
+password_policy = PasswordPolicy(
+    min_length=int(os.getenv("PASSWORD_MIN_LENGTH", "8")),
+    max_length=int(os.getenv("PASSWORD_MAX_LENGTH", "128")),
+    require_special=os.getenv("PASSWORD_REQUIRE_SPECIAL", "true").lower() == "true",
+)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        print("Usage: python -m app.utils.password_policy build <wordlist.txt> <output.bin>")
+        sys.exit(1)
+    print(f"Wrote {build_common_password_file(sys.argv[2], sys.argv[3])} password hashes to {sys.argv[3]}")
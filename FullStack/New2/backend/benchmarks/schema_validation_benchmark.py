@@ -0,0 +1,92 @@
+"""
+Per-row cost of building user response models: validated vs. trusted paths.
+
+Builds ROWS users shaped like the list and profile responses and times, per
+row, full validation (model_validate) against the from_trusted constructors
+used for rows that were already validated when they were written. Also
+times the UserBase name/contact validators alone, with the compiled module
+patterns against the string patterns they replaced.
+
+Usage (from the New2/backend directory):
+    python -m benchmarks.schema_validation_benchmark [--rows 5000] [--repeat 5]
+"""
+
+import argparse
+import re
+import time
+from types import SimpleNamespace
+from app.schemas.user import UserBase, UserListResponse, UserRead
+
+
+def make_rows(count: int) -> list:
+    return [
+        {
+            "id": i,
+            "first_name": "Asha",
+            "last_name": "O'Neil-Rao",
+            "email": f"user{i}@example.com",
+            "contact_number": f"98{i:08d}"[:10],
+            "address": "12 MG Road, Bengaluru",
+            "profile_pic": None,
+            "is_active": True,
+            "role": {"id": 2, "name": "user"},
+        }
+        for i in range(count)
+    ]
+
+
+def as_orm_user(row: dict) -> SimpleNamespace:
+    return SimpleNamespace(**{**row, "role": SimpleNamespace(**row["role"])})
+
+
+def string_pattern_validators(row: dict):
+    # The validators as they were before the patterns were compiled at module level
+    for name in (row["first_name"], row["last_name"]):
+        re.match(r"^[a-zA-Z\s'-]+$", name.strip())
+    digits_only = re.sub(r"\D", "", row["contact_number"])
+    re.match(r"^[6-9]\d{9}$", digits_only)
+
+
+def compiled_pattern_validators(row: dict):
+    for name in (row["first_name"], row["last_name"]):
+        UserBase.validate_names(name)
+    UserBase.validate_contact_number(row["contact_number"])
+
+
+def best_of(repeat: int, func, items) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    users = [as_orm_user(row) for row in rows]
+
+    cases = [
+        ("list validate", lambda row: UserListResponse.model_validate(row), rows),
+        ("list trusted", UserListResponse.from_trusted, rows),
+        ("read validate", UserRead.model_validate, users),
+        ("read trusted", UserRead.from_trusted, users),
+        ("regex strings", string_pattern_validators, rows),
+        ("regex compiled", compiled_pattern_validators, rows),
+    ]
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'path':<16}{'seconds':>10}{'us/row':>10}")
+    for name, func, items in cases:
+        seconds = best_of(args.repeat, func, items)
+        print(f"{name:<16}{seconds:>10.4f}{seconds / args.rows * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import { useAuth } from "../context/AuthContext";
 import { useEffect, useState, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
-import axios from '../api/axios';
+import { fetchAllUsers } from '../api/users';
 import { colors } from '../utils/colors';
 import { getImageUrl } from "../config/api";
 import {
@@ -47,8 +47,7 @@ function Dashboard() {
                 setLoading(true);
                 // Only fetch user stats if user is admin
                 if (user?.role?.name === 'admin') {
-                    const response = await axios.get('/users/list');
-                    const users = response.data.users || [];
+                    const users = await fetchAllUsers();
                     setStats({
                         totalUsers: users.length,
                         activeUsers: users.filter(u => u.is_active).length,
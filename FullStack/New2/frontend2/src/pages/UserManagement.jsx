@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import axios from '../api/axios';
+import { fetchAllUsers } from '../api/users';
 import { colors } from '../utils/colors';
 import { useSnackbar } from 'notistack';
 import { showSuccess, showError } from '../utils/snackbar';
@@ -58,8 +59,7 @@ function AdminPanel() {
     const fetchUsers = useCallback(async () => {
         try {
             setLoading(true);
-            const response = await axios.get('/users/list');
-            setUsers(response.data.users || []);
+            setUsers(await fetchAllUsers());
         } catch (error) {
             showError(enqueueSnackbar, 'Failed to fetch users');
             console.error('Error fetching users:', error);
@@ -1,9 +1,17 @@
 from fastapi import FastAPI
 from . import controllers
-from .database import init_db
+from .database import engine, init_db
+from .query_profiler import QueryProfilerMiddleware, instrument_engine
 
 app = FastAPI()
 
+instrument_engine(engine)
+
+# Per-route SQL query budgets; exceeding one is logged, or raised with QUERY_BUDGET_STRICT=true
+QUERY_BUDGETS = {}
+
+app.add_middleware(QueryProfilerMiddleware, budgets=QUERY_BUDGETS)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Employee Management API"}
@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Per-request SQL instrumentation. Engine events count every statement run
+# while a request (or a capture_queries block) is active; the middleware
+# reports the totals as a Server-Timing header and a log line, warns about
+# statements repeated often enough to look like N+1 loading, and enforces
+# per-route query budgets.
+QUERY_PROFILER_ENABLED = os.getenv("QUERY_PROFILER_ENABLED", "true").lower() == "true"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+# Budgets as JSON, e.g. {"GET /users/list": 3}; merged over the ones passed in code
+QUERY_BUDGETS = json.loads(os.getenv("QUERY_BUDGETS", "{}"))
+# In strict mode (tests, CI) an exceeded budget raises instead of logging
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so calls differing only in literals compare equal"""
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAM_LIST.sub("(?+)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class QueryStats:
+    __slots__ = ("count", "duration", "fingerprints")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.duration += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        return [(statement, count) for statement, count in self.fingerprints.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        # Kept on the execution context, which a failed statement simply discards
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = getattr(context, "_query_start", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine):
+    """Attach the profiler to an engine (sync or async); safe to call twice"""
+    target = getattr(engine, "sync_engine", engine)
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+@contextmanager
+def capture_queries():
+    """Collect QueryStats for the enclosed block, e.g. to assert on query counts in tests"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route, e.g. /users/{user_id}/role, including router prefixes"""
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return scope["path"]
+    # Routes of included routers may not carry their prefix; recover it from the concrete path
+    params = {name: str(value) for name, value in scope.get("path_params", {}).items()}
+    try:
+        rendered = path_format.format(**params)
+    except (KeyError, IndexError):
+        return path_format
+    path = scope["path"]
+    return path[:-len(rendered)] + path_format if rendered and path.endswith(rendered) else path_format
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware recording the SQL each request runs.
+
+    Sync endpoints and dependencies run in a threadpool that copies the
+    request's context, so their queries land in the same QueryStats.
+    """
+
+    def __init__(self, app, budgets: Optional[Dict[str, int]] = None, strict: bool = QUERY_BUDGET_STRICT,
+                 n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.budgets = {**(budgets or {}), **QUERY_BUDGETS}
+        self.strict = strict
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_PROFILER_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+        # Only completed requests are checked, so a budget failure never masks the real error
+        self._report(scope, stats)
+
+    def _report(self, scope, stats: QueryStats):
+        route_key = f"{scope['method']} {route_template(scope)}"
+        logger.info(f"{route_key}: {stats.count} queries in {stats.duration * 1000:.2f}ms")
+
+        for statement, count in stats.repeated(self.n_plus_one_threshold):
+            logger.warning(f"Possible N+1 in {route_key}: statement ran {count} times: {statement[:200]}")
+
+        budget = self.budgets.get(route_key)
+        if budget is not None and stats.count > budget:
+            message = f"{route_key} ran {stats.count} queries, over its budget of {budget}"
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
@@ -9,11 +9,11 @@ from app.logger.logger import logger
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/signup", response_model=UserResponse)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
-    logger.info(f"User {user.email} is signing up")
-    return user_service.create_user(user, db)
+async def signup(user: UserCreate, db: Session = Depends(get_db)):
+    logger.info("User %s is signing up", user.email)
+    return await user_service.create_user(user, db)
 
 @router.post("/login", response_model=Token)
-def login(user_login: UserLogin, db: Session = Depends(get_db)):
-    logger.info(f"User {user_login.email} is attempting to log in")
-    return user_service.authenticate_user(user_login.email, user_login.password, db)
+async def login(user_login: UserLogin, db: Session = Depends(get_db)):
+    logger.info("User %s is attempting to log in", user_login.email)
+    return await user_service.authenticate_user(user_login.email, user_login.password, db)
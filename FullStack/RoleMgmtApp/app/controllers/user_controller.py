@@ -1,12 +1,17 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.schemas.user_schema import UserResponse, UserUpdate, RoleUpdateRequest, UserCreate, BulkUserAction, PasswordResetRequest
-from app.services import user_service
-from app.utils.dependencies import get_current_user, get_db, require_role
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.user_schema import UserResponse, UserUpdate, RoleUpdateRequest, UserCreate, BulkUserAction, PasswordResetRequest, UserListParams, UserPageResponse, BulkActionResponse, UserMinimal, UserImportResponse
+from app.services import user_service, import_service
+from app.services.export_service import stream_user_export, parse_export_columns, EXPORT_MEDIA_TYPES
+from app.utils.dependencies import get_current_user, get_db, require_role, get_user_list_params, get_async_db
 from app.models.user import User
+from app.utils.file_utils import save_upload_file, delete_profile_pic, PROFILE_PIC_DIR, PROFILE_PIC_URL_PREFIX
+from app.utils.image_variants import generate_variants_async, digest_from_path
+import asyncio
 import os
-from uuid import uuid4
 from app.logger.logger import logger
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -14,7 +19,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 # USER PROFILE MANAGEMENT (All roles)
 @router.get("/me", response_model=UserResponse)
 def read_my_profile(current_user: User = Depends(get_current_user)):
-    logger.info(f"User {current_user.email} accessed their profile")
+    logger.info("User %s accessed their profile", current_user.email)
     return user_service.get_user_profile(current_user)
 
 @router.put("/me", response_model=UserResponse)
@@ -23,55 +28,54 @@ def update_my_profile(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    logger.info(f"User {current_user.email} updated their profile")
+    logger.info("User %s updated their profile", current_user.email)
     return user_service.update_user_profile(current_user, user_update, db)
 
 @router.post("/me/profile-pic", response_model=UserResponse)
-def upload_profile_pic(
+async def upload_profile_pic(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    logger.info(f"User {current_user.email} uploaded profile picture")
-    if not file.content_type.startswith("image/"):
+    logger.info("User %s uploaded profile picture", current_user.email)
+    if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Invalid image file")
     
-    filename = f"{uuid4().hex}_{file.filename}"
-    file_path = os.path.join("static/profile_pics", filename)
-    
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
-        
-    # Save relative path or URL
-    current_user.profile_pic = f"/static/profile_pics/{filename}"
-    db.commit()
-    db.refresh(current_user)
-    
-    # Create response with role information
-    response_data = {
-        "id": current_user.id,
-        "email": current_user.email,
-        "first_name": current_user.first_name,
-        "last_name": current_user.last_name,
-        "contact_number": current_user.contact_number,
-        "address": current_user.address,
-        "is_active": current_user.is_active,
-        "profile_pic": current_user.profile_pic,
-        "role": current_user.role.name if current_user.role else None
-    }
+    filename = await save_upload_file(file)
+    await generate_variants_async(os.path.join(PROFILE_PIC_DIR, filename), digest_from_path(filename))
+
+    # Save relative path or URL; the commit runs on a worker thread, off the event loop
+    profile, cleanup = await asyncio.to_thread(
+        user_service.set_profile_pic, current_user, f"{PROFILE_PIC_URL_PREFIX}{filename}", db
+    )
+
+    # A replaced upload nobody else uses is removed after the response has been sent
+    if cleanup:
+        background_tasks.add_task(delete_profile_pic, **cleanup)
     
-    return response_data
+    return profile
+
+@router.get("/search", response_model=List[UserMinimal])
+def search_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix of email, first name or last name"),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Type-ahead user search - results are scoped by the caller's role"""
+    return user_service.search_users(q, current_user, db, limit)
 
 # ADMIN & SUPER ADMIN FUNCTIONS
 @router.post("/admin/create-user", response_model=UserResponse)
-def create_user_by_admin(
+async def create_user_by_admin(
     user_data: UserCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ):
     """Create a new user - accessible by admin and super_admin"""
-    logger.info(f"Admin {current_user.email} is creating a new user: {user_data.email}")
-    return user_service.create_user_by_admin(user_data, current_user, db)
+    logger.info("Admin %s is creating a new user: %s", current_user.email, user_data.email)
+    return await user_service.create_user_by_admin(user_data, current_user, db)
 
 @router.put("/{user_id}", response_model=UserResponse)
 def update_user_by_id(
@@ -81,7 +85,7 @@ def update_user_by_id(
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ):
     """Update any user - accessible by admin and super_admin"""
-    logger.info(f"Admin {current_user.email} is updating user {user_id}")
+    logger.info("Admin %s is updating user %s", current_user.email, user_id)
     return user_service.update_user_by_admin(user_id, user_update, current_user, db)
 
 @router.put("/{user_id}/role", response_model=UserResponse)
@@ -92,7 +96,7 @@ def change_user_role(
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ):
     """Change user role - accessible by admin and super_admin"""
-    logger.info(f"Admin {current_user.email} changed role for user {user_id} to {role_update.new_role}")
+    logger.info("Admin %s changed role for user %s to %s", current_user.email, user_id, role_update.new_role)
     return user_service.change_user_role(user_id, role_update.new_role, current_user, db)
 
 @router.patch("/{user_id}/deactivate", response_model=UserResponse)
@@ -102,7 +106,7 @@ def deactivate_user(
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ):
     """Deactivate a user - accessible by admin and super_admin"""
-    logger.info(f"Admin {current_user.email} is deactivating user {user_id}")
+    logger.info("Admin %s is deactivating user %s", current_user.email, user_id)
     return user_service.deactivate_user(user_id, current_user, db)
 
 @router.patch("/{user_id}/activate", response_model=UserResponse)
@@ -112,63 +116,94 @@ def activate_user(
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ):
     """Activate a user - accessible by admin and super_admin"""
-    logger.info(f"Admin {current_user.email} is activating user {user_id}")
+    logger.info("Admin %s is activating user %s", current_user.email, user_id)
     return user_service.activate_user(user_id, current_user, db)
 
 @router.post("/{user_id}/reset-password", response_model=UserResponse)
-def reset_user_password(
+async def reset_user_password(
     user_id: int,
     password_data: PasswordResetRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ):
     """Reset user password - accessible by admin and super_admin"""
-    logger.info(f"Admin {current_user.email} is resetting password for user {user_id}")
-    return user_service.reset_user_password(user_id, password_data.new_password, current_user, db)
+    logger.info("Admin %s is resetting password for user %s", current_user.email, user_id)
+    return await user_service.reset_user_password(user_id, password_data.new_password, current_user, db)
 
-@router.post("/admin/bulk-action", response_model=List[UserResponse])
+@router.post("/admin/bulk-action", response_model=BulkActionResponse)
 def bulk_user_action(
     action_data: BulkUserAction,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ):
     """Perform bulk actions on users - accessible by admin and super_admin"""
-    logger.info(f"Admin {current_user.email} performing bulk action: {action_data.action}")
+    logger.info("Admin %s performing bulk action: %s", current_user.email, action_data.action)
     return user_service.bulk_user_action(action_data.user_ids, action_data.action, current_user, db)
 
+@router.post("/admin/import", response_model=UserImportResponse)
+async def import_users(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role(["admin", "super_admin"]))
+):
+    """Create users from a CSV or NDJSON file with per-row errors - accessible by admin and super_admin"""
+    logger.info("Admin %s started a %s user import", current_user.email, format)
+    return await import_service.import_users(file, format, current_user, db)
+
 # ADMIN FUNCTIONS (Admin can see standard users they can manage)
-@router.get("/admin/standard-users", response_model=List[UserResponse])
+@router.get("/admin/standard-users", response_model=UserPageResponse)
 def get_all_standard_users(
+    params: UserListParams = Depends(get_user_list_params),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ):
     """Get all standard users - accessible by admin and super_admin"""
-    return user_service.get_standard_users_for_admin(current_user, db)
+    return user_service.get_standard_users_for_admin(current_user, params, db)
 
 @router.get("/admin/dashboard", response_model=dict)
-def get_admin_dashboard(
-    db: Session = Depends(get_db),
+async def get_admin_dashboard(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ):
     """Get admin dashboard statistics"""
-    return user_service.get_admin_dashboard(current_user, db)
+    return await user_service.get_admin_dashboard_async(current_user, db)
 
 # SUPER ADMIN ONLY FUNCTIONS
-@router.get("/super-admin/all-users", response_model=List[UserResponse])
+@router.get("/super-admin/all-users", response_model=UserPageResponse)
 def get_all_users_super_admin(
+    params: UserListParams = Depends(get_user_list_params),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["super_admin"]))
 ):
     """Get all users including admins - super_admin only"""
-    return user_service.get_all_users_for_super_admin(current_user, db)
+    return user_service.get_all_users_for_super_admin(current_user, params, db)
 
-@router.get("/super-admin/admins", response_model=List[UserResponse])
+@router.get("/super-admin/admins", response_model=UserPageResponse)
 def get_all_admins_super_admin(
+    params: UserListParams = Depends(get_user_list_params),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["super_admin"]))
 ):
     """Get all admin users - super_admin only"""
-    return user_service.get_admins_for_super_admin(current_user, db)
+    return user_service.get_admins_for_super_admin(current_user, params, db)
+
+@router.get("/super-admin/export")
+def export_users_super_admin(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to include"),
+    role: Optional[str] = Query(None, pattern="^(super_admin|admin|standard_user)$"),
+    is_active: Optional[bool] = Query(None),
+    current_user: User = Depends(require_role(["super_admin"]))
+):
+    """Stream every matching user as NDJSON or CSV - super_admin only"""
+    selected_columns = parse_export_columns(columns)
+    logger.info("Super admin %s started a %s user export", current_user.email, format)
+    return StreamingResponse(
+        stream_user_export(format, selected_columns, role, is_active),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'}
+    )
 
 @router.post("/super-admin/create-admin", response_model=UserResponse)
 def create_admin_by_super_admin(
@@ -177,5 +212,5 @@ def create_admin_by_super_admin(
     current_user: User = Depends(require_role(["super_admin"]))
 ):
     """Create a new admin user - super_admin only"""
-    logger.info(f"Super admin {current_user.email} is creating a new admin: {user_data.email}")
+    logger.info("Super admin %s is creating a new admin: %s", current_user.email, user_data.email)
     return user_service.create_admin_by_super_admin(user_data, current_user, db)
\ No newline at end of file
@@ -1,11 +1,47 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app.dbconfig.sqlite_profile import create_sqlite_engine, apply_sqlite_pragmas
 from app.logger.logger import logger
 
+# Async driver to use for each sync URL scheme
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def _pool_options(url) -> dict:
+    """Pool sizing from the environment; in-memory SQLite keeps its default pool"""
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    options.update({
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    })
+    return options
+
+
+def to_async_url(database_url: str) -> str:
+    url = make_url(database_url)
+    driver = _ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
 try:
-    DATABASE_URL = "sqlite:///./rolemgmt.db"
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./rolemgmt.db")
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+    sync_url = make_url(DATABASE_URL)
+    engine = create_sqlite_engine(DATABASE_URL, **_pool_options(sync_url))
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base = declarative_base()
 except KeyError as e:
@@ -13,3 +49,18 @@ except KeyError as e:
 except Exception as e:
     logger.error(f"An error occurred while setting up the database: {e}")
 
+# The async path is optional: without its driver (aiosqlite/asyncpg) installed
+# the app still starts, but routes that depend on get_async_db - currently
+# GET /users/admin/dashboard - answer 503 until the driver is installed.
+async_engine = None
+AsyncSessionLocal = None
+try:
+    async_url = make_url(ASYNC_DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options(async_url))
+    if async_url.get_backend_name() == "sqlite":
+        apply_sqlite_pragmas(async_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+except ImportError as e:
+    logger.warning(f"Async database driver not installed, async sessions disabled: {e}")
+except Exception as e:
+    logger.error(f"An error occurred while setting up the async database: {e}")
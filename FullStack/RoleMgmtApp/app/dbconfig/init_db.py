@@ -1,9 +1,13 @@
 from app.dbconfig.database import Base, engine, SessionLocal
 from app.models.user import User
 from app.models.role import Role
+from app.models.user_stat import UserStat
+from app.services.search_service import ensure_search_index
+from app.utils.role_registry import role_registry
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
 
     db = SessionLocal()
     default_roles = ["super_admin", "admin", "standard_user"]
@@ -13,4 +17,5 @@ def init_db():
             new_role = Role(name=role_name)
             db.add(new_role)
     db.commit()
+    role_registry.load(db)
     db.close()
@@ -2,15 +2,54 @@ from fastapi import FastAPI
 from app.dbconfig.init_db import init_db
 from app.controllers import auth_controller, user_controller
 from fastapi.staticfiles import StaticFiles
+from app.utils.password_hashing import password_executor
+from app.utils.image_variants import shutdown_image_pool
+from app.services.stats_service import DASHBOARD_COUNTERS_ENABLED, run_counter_reconcile_loop
+from app.dbconfig.database import engine, async_engine
+from app.dbconfig.query_profiler import QueryProfilerMiddleware, instrument_engine
+from app.utils.metrics import MetricsMiddleware, metrics, metrics_endpoint, instrument_pool, register_caches
+from app.utils.user_cache import principal_cache
+from app.utils.token_cache import token_cache
+from app.logger.logger import dropped_log_records
+import asyncio
 
 app = FastAPI()
 
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine)
+
 init_db()
 
 app.include_router(auth_controller.router)
 app.include_router(user_controller.router)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+background_tasks = []
+
+@app.on_event("startup")
+async def start_counter_reconcile():
+    if DASHBOARD_COUNTERS_ENABLED:
+        background_tasks.append(asyncio.create_task(run_counter_reconcile_loop()))
+
+@app.on_event("shutdown")
+def shutdown_password_executor():
+    password_executor.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_image_workers():
+    shutdown_image_pool()
+
+@app.on_event("shutdown")
+def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
+
 @app.get("/")
 def root():
     return {"message": "Role Management App is running"}
@@ -29,3 +68,30 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+# Per-route SQL query budgets; exceeding one is logged, or raised with QUERY_BUDGET_STRICT=true
+QUERY_BUDGETS = {
+    "GET /users/me": 1,
+    "GET /users/search": 2,
+    "GET /users/admin/dashboard": 2,
+    "GET /users/admin/standard-users": 2,
+    "GET /users/super-admin/all-users": 2,
+    "GET /users/super-admin/admins": 2,
+}
+
+app.add_middleware(QueryProfilerMiddleware, budgets=QUERY_BUDGETS)
+
+# Runtime metrics in Prometheus text format at /metrics
+instrument_pool(engine)
+if async_engine is not None:
+    instrument_pool(async_engine, "async")
+metrics.gauge("password_hash_queue_depth", "bcrypt jobs waiting for a worker", lambda: password_executor.queued)
+metrics.gauge("password_hash_in_flight", "bcrypt jobs running", lambda: password_executor.in_flight)
+metrics.gauge("password_hash_rejected_total", "bcrypt jobs turned away with a 503",
+              lambda: password_executor.rejected, metric_type="counter")
+register_caches({"principal": principal_cache.stats, "token": token_cache.stats})
+metrics.gauge("log_records_dropped_total", "Log records dropped because the log queue was full",
+              dropped_log_records, metric_type="counter")
+
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+app.add_middleware(MetricsMiddleware)
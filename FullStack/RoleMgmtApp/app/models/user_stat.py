@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, Boolean, ForeignKey
+from app.dbconfig.database import Base
+
+class UserStat(Base):
+    """Materialized user counts per (role, is_active) bucket for the admin dashboard"""
+    __tablename__ = "user_stats"
+
+    role_id = Column(Integer, ForeignKey("roles.id"), primary_key=True)
+    is_active = Column(Boolean, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
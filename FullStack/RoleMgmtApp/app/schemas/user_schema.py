@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Dict
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -9,7 +10,6 @@ class UserCreate(BaseModel):
     contact_number: Optional[str] = Field(None, max_length=15)
     address: Optional[str] = Field(None, max_length=255)
     is_active: bool = True
-    profile_pic: Optional[str] = None
     role: Optional[str] = Field("standard_user", max_length=50)
 
 class UserUpdate(BaseModel):
@@ -19,7 +19,6 @@ class UserUpdate(BaseModel):
     contact_number: Optional[str] = Field(None, max_length=15)
     address: Optional[str] = Field(None, max_length=255)
     is_active: Optional[bool] = None
-    profile_pic: Optional[str] = None
 
 class UserResponse(BaseModel):
     id: int
@@ -30,11 +29,26 @@ class UserResponse(BaseModel):
     address: Optional[str] = None
     is_active: bool = True
     profile_pic: Optional[str] = None
+    profile_pic_variants: Optional[Dict[str, str]] = None
     role: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class UserListParams(BaseModel):
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+    sort_by: str = Field("id", pattern="^(id|email|first_name|last_name)$")
+    order: str = Field("asc", pattern="^(asc|desc)$")
+    role: Optional[str] = Field(None, pattern="^(super_admin|admin|standard_user)$")
+    is_active: Optional[bool] = None
+    q: Optional[str] = Field(None, max_length=100)
+
+class UserPageResponse(BaseModel):
+    users: List[UserResponse]
+    next_cursor: Optional[str] = None
+    limit: int
+
 class UserMinimal(BaseModel):
     id: int
     first_name: Optional[str] = None
@@ -57,4 +71,30 @@ class PasswordResetRequest(BaseModel):
 
 class BulkUserAction(BaseModel):
     user_ids: List[int]
-    action: str = Field(..., pattern="^(activate|deactivate|delete)$")
\ No newline at end of file
+    action: str = Field(..., pattern="^(activate|deactivate|delete)$")
+
+class BulkActionResult(BaseModel):
+    user_id: int
+    success: bool
+    status_code: int
+    detail: Optional[str] = None
+    user: Optional[UserResponse] = None
+
+class BulkActionResponse(BaseModel):
+    action: str
+    succeeded: int
+    failed: int
+    results: List[BulkActionResult]
+
+class ImportRowError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status_code: int
+    detail: str
+
+class UserImportResponse(BaseModel):
+    format: str
+    total: int
+    created: int
+    failed: int
+    errors: List[ImportRowError]
@@ -0,0 +1,233 @@
+import asyncio
+import csv
+import io
+import json
+import os
+from collections import Counter
+from typing import Iterator, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.schemas.user_schema import UserCreate
+from app.services.stats_service import adjust_user_counter
+from app.services.user_service import check_create_role
+from app.utils.password_hashing import password_executor
+from app.utils.role_registry import role_registry
+from app.utils.validators import validate_email, validate_password_strength
+from app.logger.logger import logger
+
+IMPORT_CHUNK_SIZE = int(os.getenv("USER_IMPORT_CHUNK_SIZE", "500"))
+IMPORT_MAX_ROWS = int(os.getenv("USER_IMPORT_MAX_ROWS", "50000"))
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# (row number, record, parse error) - row numbers are file line numbers
+ImportRecord = Tuple[int, Optional[dict], Optional[str]]
+
+
+def _parse_records(stream, format: str) -> Iterator[ImportRecord]:
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Empty cells fall back to the schema defaults; unnamed extra cells are dropped
+            yield reader.line_num, {key: value for key, value in record.items() if key and value not in ("", None)}, None
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def iter_import_chunks(stream, format: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[List[ImportRecord]]:
+    """Read the upload lazily, chunk_size records at a time"""
+    chunk = []
+    for record in _parse_records(stream, format):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _row_error(row: int, email: Optional[str], status_code: int, detail: str) -> dict:
+    return {"row": row, "email": email, "status_code": status_code, "detail": detail}
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+
+def _validate_chunk(db: Session, chunk: List[ImportRecord], current_role: str, seen_emails: set):
+    """Split a chunk into creatable users and per-row errors, checking existing emails in one IN query"""
+    errors = []
+    candidates = []
+    for row, record, parse_error in chunk:
+        if parse_error:
+            errors.append(_row_error(row, None, 400, parse_error))
+            continue
+        try:
+            user_data = UserCreate.model_validate(record)
+        except ValidationError as e:
+            errors.append(_row_error(row, record.get("email"), 422, _validation_message(e)))
+            continue
+
+        if not validate_email(user_data.email):
+            errors.append(_row_error(row, user_data.email, 400, "Invalid email format"))
+            continue
+        is_strong, password_msg = validate_password_strength(user_data.password)
+        if not is_strong:
+            errors.append(_row_error(row, user_data.email, 400, password_msg))
+            continue
+
+        target_role = user_data.role or "standard_user"
+        role = role_registry.get_by_name(target_role)
+        if not role:
+            errors.append(_row_error(row, user_data.email, 400, "Invalid role"))
+            continue
+        denied = check_create_role(current_role, target_role)
+        if denied:
+            errors.append(_row_error(row, user_data.email, *denied))
+            continue
+
+        if user_data.email in seen_emails:
+            errors.append(_row_error(row, user_data.email, 400, "Duplicate email in file"))
+            continue
+        seen_emails.add(user_data.email)
+        candidates.append((row, user_data, role.id))
+
+    existing = set()
+    if candidates:
+        emails = [user_data.email for _, user_data, _ in candidates]
+        existing = {email for (email,) in db.query(User.email).filter(User.email.in_(emails)).all()}
+
+    valid = []
+    for row, user_data, role_id in candidates:
+        if user_data.email in existing:
+            errors.append(_row_error(row, user_data.email, 400, "Email already registered"))
+        else:
+            valid.append((row, user_data, role_id))
+    return valid, errors
+
+
+def _user_mapping(user_data: UserCreate, role_id: int, hashed_password: str) -> dict:
+    return {
+        "first_name": user_data.first_name,
+        "last_name": user_data.last_name,
+        "email": user_data.email,
+        "hashed_password": hashed_password,
+        "contact_number": user_data.contact_number,
+        "address": user_data.address,
+        "is_active": user_data.is_active,
+        "role_id": role_id,
+    }
+
+
+def _insert_chunk(db: Session, valid: list, hashes: List[str]) -> Tuple[int, List[dict]]:
+    """Insert a validated chunk in one transaction; returns (created, errors)"""
+    mappings = [_user_mapping(user_data, role_id, hashed) for (_, user_data, role_id), hashed in zip(valid, hashes)]
+    try:
+        db.bulk_insert_mappings(User, mappings)
+        buckets = Counter((mapping["role_id"], mapping["is_active"]) for mapping in mappings)
+        for (role_id, is_active), count in buckets.items():
+            adjust_user_counter(db, role_id, is_active, count)
+        db.commit()
+        return len(mappings), []
+    except IntegrityError:
+        db.rollback()
+
+    # An email was registered since the pre-check; insert row by row so the rest still land
+    created = 0
+    errors = []
+    for (row, user_data, role_id), mapping in zip(valid, mappings):
+        try:
+            db.bulk_insert_mappings(User, [mapping])
+            adjust_user_counter(db, role_id, mapping["is_active"], 1)
+            db.commit()
+            created += 1
+        except IntegrityError:
+            db.rollback()
+            errors.append(_row_error(row, user_data.email, 400, "Email already registered"))
+    return created, errors
+
+
+async def _import_chunk(db: Session, chunk: List[ImportRecord], current_role: str, seen_emails: set,
+                        errors: List[dict]) -> int:
+    """Validate, hash and insert one chunk; returns how many users were created"""
+    valid, chunk_errors = await asyncio.to_thread(_validate_chunk, db, chunk, current_role, seen_emails)
+    errors.extend(chunk_errors)
+    if not valid:
+        return 0
+
+    try:
+        hashes = await password_executor.hash_many([user_data.password for _, user_data, _ in valid])
+    except HTTPException as e:
+        errors.extend(_row_error(row, user_data.email, e.status_code, e.detail) for row, user_data, _ in valid)
+        return 0
+
+    created, insert_errors = await asyncio.to_thread(_insert_chunk, db, valid, hashes)
+    errors.extend(insert_errors)
+    return created
+
+
+async def import_users(upload: UploadFile, format: str, current_user, db: Session) -> dict:
+    """Create users from a CSV or NDJSON upload, chunk by chunk, reporting every rejected row.
+
+    Each chunk is validated in memory, checked against existing emails with a
+    single IN query, hashed across the password pool and inserted with one
+    bulk insert and commit, so a failure late in the file keeps earlier rows.
+    """
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format. Allowed: {', '.join(IMPORT_FORMATS)}")
+
+    current_role = current_user.role.name
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    chunks = iter_import_chunks(stream, format)
+    seen_emails = set()
+    total = 0
+    created = 0
+    last_row = 1
+    errors = []
+    try:
+        while True:
+            try:
+                # Parsing reads the spooled upload from disk, so it runs off the event loop
+                chunk = await asyncio.to_thread(next, chunks, None)
+            except (UnicodeDecodeError, csv.Error) as e:
+                errors.append(_row_error(last_row + 1, None, 400, f"Could not read the rest of the file: {e}"))
+                break
+            if chunk is None:
+                break
+
+            remaining = IMPORT_MAX_ROWS - total
+            truncated = len(chunk) > remaining
+            if truncated:
+                errors.append(_row_error(chunk[remaining][0], None, 413,
+                                         f"Imports are limited to {IMPORT_MAX_ROWS} rows; this row and the rest were skipped"))
+                chunk = chunk[:remaining]
+            total += len(chunk)
+            if chunk:
+                last_row = chunk[-1][0]
+                created += await _import_chunk(db, chunk, current_role, seen_emails, errors)
+            if truncated:
+                break
+    finally:
+        # Leave the upload's file for UploadFile to close
+        stream.detach()
+
+    errors.sort(key=lambda error: error["row"])
+    logger.info("%s imported %s of %s users from %s; %s rows rejected", current_user.email, created, total, format, len(errors))
+    return {"format": format, "total": total, "created": created, "failed": len(errors), "errors": errors}
@@ -0,0 +1,115 @@
+import re
+from typing import Optional
+from sqlalchemy import text, or_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.role import Role
+from app.utils.pagination import escape_like
+from app.logger.logger import logger
+
+MAX_SEARCH_RESULTS = 50
+
+# External-content FTS5 index over users; the triggers keep it in step with
+# every write to the users table, including bulk UPDATE/DELETE statements.
+_FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        email, first_name, last_name,
+        content='users', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2", prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, email, first_name, last_name)
+        VALUES (new.id, new.email, new.first_name, new.last_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, first_name, last_name)
+        VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF email, first_name, last_name ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, first_name, last_name)
+        VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+        INSERT INTO users_fts(rowid, email, first_name, last_name)
+        VALUES (new.id, new.email, new.first_name, new.last_name);
+    END
+    """,
+]
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+fts_enabled = False
+
+
+def ensure_search_index(engine):
+    """Create the FTS5 index and sync triggers, rebuilding the index from users"""
+    global fts_enabled
+    if engine.dialect.name != "sqlite":
+        logger.info("User search index needs SQLite FTS5; falling back to prefix LIKE search")
+        return
+
+    try:
+        with engine.begin() as conn:
+            for statement in _FTS_SCHEMA:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+        fts_enabled = True
+    except OperationalError as e:
+        logger.warning(f"FTS5 unavailable, falling back to prefix LIKE search: {e}")
+
+
+def _build_match_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query where every token is a quoted prefix"""
+    tokens = _TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_user_rows(db: Session, query: str, role_name: Optional[str] = None,
+                     user_id: Optional[int] = None, limit: int = MAX_SEARCH_RESULTS) -> list:
+    """Return ranked (id, first_name, last_name, email, role) rows matching query"""
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+
+    if fts_enabled:
+        match = _build_match_query(query)
+        if match is None:
+            return []
+        sql = """
+            SELECT users.id, users.first_name, users.last_name, users.email, roles.name AS role
+            FROM users_fts
+            JOIN users ON users.id = users_fts.rowid
+            JOIN roles ON roles.id = users.role_id
+            WHERE users_fts MATCH :match
+        """
+        params = {"match": match, "limit": limit}
+        if role_name:
+            sql += " AND roles.name = :role_name"
+            params["role_name"] = role_name
+        if user_id is not None:
+            sql += " AND users.id = :user_id"
+            params["user_id"] = user_id
+        sql += " ORDER BY bm25(users_fts) LIMIT :limit"
+        return db.execute(text(sql), params).mappings().all()
+
+    prefix = f"{escape_like(query.strip())}%"
+    rows = (
+        db.query(User.id, User.first_name, User.last_name, User.email, Role.name.label("role"))
+        .join(Role, User.role_id == Role.id)
+        .filter(or_(
+            User.email.like(prefix, escape="\\"),
+            User.first_name.like(prefix, escape="\\"),
+            User.last_name.like(prefix, escape="\\"),
+        ))
+    )
+    if role_name:
+        rows = rows.filter(Role.name == role_name)
+    if user_id is not None:
+        rows = rows.filter(User.id == user_id)
+    return [row._mapping for row in rows.order_by(User.email).limit(limit).all()]
@@ -0,0 +1,125 @@
+import asyncio
+import os
+from collections import defaultdict
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.models.role import Role
+from app.models.user_stat import UserStat
+from app.dbconfig.database import SessionLocal
+from app.logger.logger import logger
+
+# When enabled, the dashboard is served from the user_stats counter table,
+# which the user write paths keep current and a background job reconciles.
+DASHBOARD_COUNTERS_ENABLED = os.getenv("DASHBOARD_COUNTERS_ENABLED", "false").lower() == "true"
+DASHBOARD_RECONCILE_SECONDS = int(os.getenv("DASHBOARD_RECONCILE_SECONDS", "300"))
+
+
+async def get_user_counts_async(db: AsyncSession) -> dict:
+    """Count users per (role name, is_active): one grouped query, or the counter table when enabled"""
+    if DASHBOARD_COUNTERS_ENABLED:
+        statement = (
+            select(Role.name, UserStat.is_active, UserStat.count)
+            .join(Role, UserStat.role_id == Role.id)
+        )
+    else:
+        statement = (
+            select(Role.name, User.is_active, func.count(User.id))
+            .select_from(User)
+            .outerjoin(Role, User.role_id == Role.id)
+            .group_by(Role.name, User.is_active)
+        )
+    result = await db.execute(statement)
+    return {(role_name, bool(is_active)): count for role_name, is_active, count in result.all()}
+
+
+def build_dashboard(current_role: str, counts: dict) -> dict:
+    """Shape grouped counts into the dashboard response for the caller's role"""
+    active_by_role = defaultdict(int)
+    total_by_role = defaultdict(int)
+    for (role_name, is_active), count in counts.items():
+        total_by_role[role_name] += count
+        if is_active:
+            active_by_role[role_name] += count
+
+    if current_role == "admin":
+        # Admin can only see standard users
+        total_users = total_by_role["standard_user"]
+        active_users = active_by_role["standard_user"]
+        return {
+            "total_users": total_users,
+            "active_users": active_users,
+            "inactive_users": total_users - active_users,
+            "user_type": "standard_users_only"
+        }
+
+    total_users = sum(total_by_role.values())
+    active_users = sum(active_by_role.values())
+    return {
+        "total_users": total_users,
+        "active_users": active_users,
+        "inactive_users": total_users - active_users,
+        "total_admins": total_by_role["admin"],
+        "total_standard_users": total_by_role["standard_user"],
+        "user_type": "all_users"
+    }
+
+
+def adjust_user_counter(db: Session, role_id: int, is_active: bool, delta: int):
+    """Add delta to a counter bucket inside the caller's transaction"""
+    if not DASHBOARD_COUNTERS_ENABLED or role_id is None or delta == 0:
+        return
+    is_active = bool(is_active)
+    updated = (
+        db.query(UserStat)
+        .filter(UserStat.role_id == role_id, UserStat.is_active == is_active)
+        .update({UserStat.count: UserStat.count + delta}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(UserStat(role_id=role_id, is_active=is_active, count=delta))
+        # Flush so a second adjustment in this transaction updates the row instead of adding another
+        db.flush()
+
+
+def track_user_change(db: Session, old_role_id, old_is_active, new_role_id, new_is_active):
+    """Move a user between counter buckets; call before the write is committed"""
+    if (old_role_id, bool(old_is_active)) == (new_role_id, bool(new_is_active)):
+        return
+    adjust_user_counter(db, old_role_id, old_is_active, -1)
+    adjust_user_counter(db, new_role_id, new_is_active, 1)
+
+
+def reconcile_user_counters(db: Session):
+    """Rebuild the counter table from the users table"""
+    rows = (
+        db.query(User.role_id, User.is_active, func.count(User.id))
+        .filter(User.role_id.isnot(None))
+        .group_by(User.role_id, User.is_active)
+        .all()
+    )
+    db.query(UserStat).delete(synchronize_session=False)
+    db.add_all([
+        UserStat(role_id=role_id, is_active=bool(is_active), count=count)
+        for role_id, is_active, count in rows
+    ])
+    db.commit()
+    logger.info("Reconciled user counters (%s buckets)", len(rows))
+
+
+def _reconcile_in_new_session():
+    db = SessionLocal()
+    try:
+        reconcile_user_counters(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"User counter reconcile failed: {e}")
+    finally:
+        db.close()
+
+
+async def run_counter_reconcile_loop(interval: int = DASHBOARD_RECONCILE_SECONDS):
+    """Background job: rebuild the counters at startup and then every interval seconds"""
+    while True:
+        await asyncio.to_thread(_reconcile_in_new_session)
+        await asyncio.sleep(interval)
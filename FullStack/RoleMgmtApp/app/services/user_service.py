@@ -1,15 +1,25 @@
-from typing import List
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+import asyncio
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.models.role import Role
-from app.schemas.user_schema import UserCreate, UserUpdate, UserMinimal
-from app.utils.auth import hash_password, verify_password, create_access_token
+from app.schemas.user_schema import UserCreate, UserUpdate, UserMinimal, UserListParams
+from app.utils.auth import create_access_token
+from app.utils.password_hashing import hash_password_async, verify_password_async
 from app.utils.validators import validate_email, validate_password_strength, validate_role_permission
+from app.utils.user_cache import invalidate_user
+from app.utils.role_registry import role_registry
+from app.utils.image_variants import variant_urls
+from app.utils.file_utils import stored_upload_digest
+from app.utils.pagination import encode_cursor, decode_cursor, escape_like
+from app.services.search_service import search_user_rows, MAX_SEARCH_RESULTS
+from app.services.stats_service import adjust_user_counter, track_user_change, get_user_counts_async, build_dashboard
 from app.logger.logger import logger
 
-def create_user(user_data: UserCreate, db: Session):
+async def create_user(user_data: UserCreate, db: Session):
     """Public user registration - creates standard_user only"""
     # Validate email format
     if not validate_email(user_data.email):
@@ -20,12 +30,12 @@ def create_user(user_data: UserCreate, db: Session):
     if not is_strong:
         raise HTTPException(status_code=400, detail=password_msg)
     
-    # Check if email already exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    # Check if email already exists; queries run on a worker thread to keep the event loop free
+    if await asyncio.to_thread(_email_taken, db, user_data.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Force role to standard_user for public registration
-    role = db.query(Role).filter(Role.name == "standard_user").first()
+    role = role_registry.get_by_name("standard_user")
     if not role:
         raise HTTPException(status_code=500, detail="Standard user role not found")
 
@@ -33,30 +43,40 @@ def create_user(user_data: UserCreate, db: Session):
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         email=user_data.email,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         contact_number=user_data.contact_number,
         address=user_data.address,
         is_active=True,
-        profile_pic=user_data.profile_pic,
         role_id=role.id
     )
+    await asyncio.to_thread(_save_new_user, db, new_user)
+    logger.info("User %s created with role standard_user", new_user.email)
+    
+    return _create_user_response(new_user)
+
+def _email_taken(db: Session, email: str) -> bool:
+    return db.query(User.id).filter(User.email == email).first() is not None
+
+def _save_new_user(db: Session, new_user: User):
     db.add(new_user)
+    adjust_user_counter(db, new_user.role_id, new_user.is_active, 1)
     db.commit()
     db.refresh(new_user)
-    logger.info(f"User {new_user.email} created with role standard_user")
-    
-    return _create_user_response(new_user)
+    new_user.role  # Load it here, not lazily from the response on the event loop
+
+def _get_user_for_login(db: Session, email: str):
+    return db.query(User).options(joinedload(User.role)).filter(User.email == email).first()
 
-def authenticate_user(email: str, password: str, db: Session):
-    user = db.query(User).options(joinedload(User.role)).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(email: str, password: str, db: Session):
+    user = await asyncio.to_thread(_get_user_for_login, db, email)
+    if not user or not await verify_password_async(password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     if not user.is_active:
         raise HTTPException(status_code=401, detail="User account is deactivated")
 
     token = create_access_token(data={"sub": str(user.id), "role": user.role.name})
-    logger.info(f"User {user.email} authenticated successfully")
+    logger.info("User %s authenticated successfully", user.email)
     return {"access_token": token, "token_type": "bearer"}
 
 def get_user_profile(user: User):
@@ -73,42 +93,79 @@ def update_user_profile(current_user: User, user_update: UserUpdate, db: Session
 
     # Update user fields
     update_data = user_update.dict(exclude_unset=True)
+    was_active = current_user.is_active
     for key, value in update_data.items():
         setattr(current_user, key, value)
 
+    track_user_change(db, current_user.role_id, was_active, current_user.role_id, current_user.is_active)
     db.commit()
+    invalidate_user(current_user.id)
     db.refresh(current_user)
-    logger.info(f"User {current_user.email} updated their profile")
+    logger.info("User %s updated their profile", current_user.email)
     
     return _create_user_response(current_user)
 
-def search_users(email: str, current_user: User, db: Session) -> List[UserMinimal]:
-    query = db.query(User).options(joinedload(User.role))
-    
-    if email:
-        query = query.filter(User.email.ilike(f"%{email}%"))
+def set_profile_pic(current_user: User, profile_pic: str, db: Session) -> Tuple[dict, Optional[dict]]:
+    """Point the user at a saved picture; blocking, so async callers run it in a thread.
+
+    Returns the profile and, when the replaced picture was an upload nobody
+    else points at, the delete_profile_pic arguments for cleaning it up.
+    """
+    previous_pic = current_user.profile_pic
+    current_user.profile_pic = profile_pic
+    db.commit()
+    invalidate_user(current_user.id)
+    db.refresh(current_user)
+
+    cleanup = None
+    previous_digest = stored_upload_digest(previous_pic)
+    if previous_digest and previous_pic != profile_pic:
+        if db.query(User.id).filter(User.profile_pic == previous_pic).first() is None:
+            # Variants are shared by every upload of the same content
+            shared = db.query(User.id).filter(User.profile_pic.like(f"%\\_{previous_digest}.%", escape="\\")).first()
+            cleanup = {"url_path": previous_pic, "remove_variants": shared is None}
+    return _create_user_response(current_user), cleanup
+
+def search_users(query: str, current_user: User, db: Session, limit: int = MAX_SEARCH_RESULTS) -> List[UserMinimal]:
+    """Ranked prefix search over email, first and last name, scoped by the caller's role"""
+    if not query or not query.strip():
+        return []
 
     # Role-based filtering
     user_role = current_user.role.name
+    role_name = None
+    user_id = None
     if user_role == "admin":
-        query = query.filter(User.role.has(name="standard_user"))
+        role_name = "standard_user"
     elif user_role == "standard_user":
-        query = query.filter(User.id == current_user.id)
+        user_id = current_user.id
     # super_admin can see all users (no additional filter)
 
-    users = query.all()
+    rows = search_user_rows(db, query, role_name=role_name, user_id=user_id, limit=limit)
     return [
         UserMinimal(
-            id=user.id,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            email=user.email,
-            role=user.role.name
-        )   
-        for user in users
+            id=row["id"],
+            first_name=row["first_name"],
+            last_name=row["last_name"],
+            email=row["email"],
+            role=row["role"]
+        )
+        for row in rows
     ]
 
-def create_user_by_admin(user_data: UserCreate, current_user: User, db: Session):
+def check_create_role(current_role: str, target_role: str):
+    """Return (status_code, detail) if current_role may not create a target_role user, else None"""
+    if current_role == "admin":
+        if target_role != "standard_user":
+            return 403, "Admins can only create standard_user accounts"
+    elif current_role == "super_admin":
+        if target_role == "super_admin":
+            return 403, "Cannot create another super_admin account"
+    else:
+        return 403, "Insufficient permissions to create users"
+    return None
+
+async def create_user_by_admin(user_data: UserCreate, current_user: User, db: Session):
     """Create a new user by admin or super_admin with role-based restrictions"""
     
     # Validate email format
@@ -121,7 +178,7 @@ def create_user_by_admin(user_data: UserCreate, current_user: User, db: Session)
         raise HTTPException(status_code=400, detail=password_msg)
     
     # Check if email already exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await asyncio.to_thread(_email_taken, db, user_data.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Role-based restrictions
@@ -129,47 +186,29 @@ def create_user_by_admin(user_data: UserCreate, current_user: User, db: Session)
     target_role = user_data.role or "standard_user"
     
     # Validate the target role exists
-    role_obj = db.query(Role).filter(Role.name == target_role).first()
+    role_obj = role_registry.get_by_name(target_role)
     if not role_obj:
         raise HTTPException(status_code=400, detail="Invalid role")
     
     # Apply role-based creation restrictions
-    if current_role == "admin":
-        if target_role != "standard_user":
-            raise HTTPException(
-                status_code=403, 
-                detail="Admins can only create standard_user accounts"
-            )
-    elif current_role == "super_admin":
-        if target_role == "super_admin":
-            raise HTTPException(
-                status_code=403,
-                detail="Cannot create another super_admin account"
-            )
-    else:
-        raise HTTPException(
-            status_code=403,
-            detail="Insufficient permissions to create users"
-        )
+    denied = check_create_role(current_role, target_role)
+    if denied:
+        raise HTTPException(status_code=denied[0], detail=denied[1])
 
     # Create the new user
     new_user = User(
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         email=user_data.email,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         contact_number=user_data.contact_number,
         address=user_data.address,
         is_active=user_data.is_active,
-        profile_pic=user_data.profile_pic,
         role_id=role_obj.id
     )
+    await asyncio.to_thread(_save_new_user, db, new_user)
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    logger.info(f"Admin {current_user.email} created user {new_user.email} with role {target_role}")
+    logger.info("Admin %s created user %s with role %s", current_user.email, new_user.email, target_role)
     return _create_user_response(new_user)
 
 def update_user_by_admin(user_id: int, user_update: UserUpdate, current_user: User, db: Session):
@@ -201,17 +240,20 @@ def update_user_by_admin(user_id: int, user_update: UserUpdate, current_user: Us
     
     # Update user fields
     update_data = user_update.dict(exclude_unset=True)
+    was_active = target_user.is_active
     for key, value in update_data.items():
         setattr(target_user, key, value)
 
+    track_user_change(db, target_user.role_id, was_active, target_user.role_id, target_user.is_active)
     db.commit()
+    invalidate_user(target_user.id)
     db.refresh(target_user)
-    logger.info(f"User {current_user.email} updated user {target_user.email}")
+    logger.info("User %s updated user %s", current_user.email, target_user.email)
     
     return _create_user_response(target_user)
 
 def change_user_role(user_id: int, new_role: str, current_user: User, db: Session):
-    if current_user.role.name != "super_admin":
+    if not role_registry.has_permission(current_user.role.name, "roles:assign"):
         raise HTTPException(status_code=403, detail="Only super admins can change roles")
 
     target_user = db.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
@@ -224,48 +266,100 @@ def change_user_role(user_id: int, new_role: str, current_user: User, db: Sessio
     if target_user.role.name == "super_admin":
         raise HTTPException(status_code=403, detail="Cannot change role of another super admin")
 
-    role_obj = db.query(Role).filter(Role.name == new_role).first()
+    role_obj = role_registry.get_by_name(new_role)
     if not role_obj:
         raise HTTPException(status_code=400, detail="Invalid role")
 
+    track_user_change(db, target_user.role_id, target_user.is_active, role_obj.id, target_user.is_active)
     target_user.role_id = role_obj.id
     db.commit()
+    invalidate_user(target_user.id)
     db.refresh(target_user)
-    logger.info(f"User {current_user.email} changed role of user {target_user.email} to {new_role}")
+    logger.info("User %s changed role of user %s to %s", current_user.email, target_user.email, new_role)
     
     return _create_user_response(target_user)
 
-def get_users_by_role(current_user: User, role_filter: str, db: Session):
-    """Generic function to get users by role"""
+_SORT_COLUMNS = {
+    "id": User.id,
+    "email": User.email,
+    "first_name": User.first_name,
+    "last_name": User.last_name,
+}
+
+def get_users_by_role(current_user: User, role_filter: str, params: UserListParams, db: Session):
+    """Generic function to get one keyset-paginated page of users by role"""
     current_role = current_user.role.name
     
     if current_role == "super_admin":
         # Super admin can see all users or filter by role
         if role_filter == "all":
-            users = db.query(User).options(joinedload(User.role)).all()
-        else:
-            users = db.query(User).options(joinedload(User.role)).filter(User.role.has(name=role_filter)).all()
+            role_filter = params.role
+        elif params.role and params.role != role_filter:
+            raise HTTPException(status_code=400, detail=f"This listing only contains {role_filter} users")
     elif current_role == "admin":
         # Admin can only see standard users
-        if role_filter != "standard_user":
+        if role_filter != "standard_user" or params.role not in (None, "standard_user"):
             raise HTTPException(status_code=403, detail="Admins can only access standard users")
-        users = db.query(User).options(joinedload(User.role)).filter(User.role.has(name="standard_user")).all()
     else:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
-    
-    return [_create_user_response(user) for user in users]
 
-def get_standard_users_for_admin(current_user: User, db: Session):
+    # Plain join so the role filter and the role name come from the same query
+    query = db.query(User).join(User.role).options(contains_eager(User.role))
+    if role_filter:
+        query = query.filter(Role.name == role_filter)
+    if params.is_active is not None:
+        query = query.filter(User.is_active == params.is_active)
+    if params.q:
+        prefix = f"{escape_like(params.q.strip())}%"
+        query = query.filter(or_(
+            User.email.like(prefix, escape="\\"),
+            User.first_name.like(prefix, escape="\\"),
+            User.last_name.like(prefix, escape="\\"),
+        ))
+
+    sort_column = _SORT_COLUMNS[params.sort_by]
+    descending = params.order == "desc"
+    position = decode_cursor(params.cursor, params.sort_by, params.order)
+    if position:
+        if params.sort_by == "id":
+            query = query.filter(User.id < position["id"] if descending else User.id > position["id"])
+        else:
+            key = tuple_(sort_column, User.id)
+            after = (position["value"], position["id"])
+            query = query.filter(key < after if descending else key > after)
+
+    if params.sort_by == "id":
+        order_by = [User.id.desc() if descending else User.id.asc()]
+    elif descending:
+        order_by = [sort_column.desc(), User.id.desc()]
+    else:
+        order_by = [sort_column.asc(), User.id.asc()]
+
+    # Fetch one extra row to learn whether another page exists
+    users = query.order_by(*order_by).limit(params.limit + 1).all()
+    next_cursor = None
+    if len(users) > params.limit:
+        users = users[:params.limit]
+        last = users[-1]
+        next_cursor = encode_cursor(params.sort_by, params.order, getattr(last, params.sort_by), last.id)
+
+    return {
+        "users": [_create_user_response(user) for user in users],
+        "next_cursor": next_cursor,
+        "limit": params.limit
+    }
+
+def get_standard_users_for_admin(current_user: User, params: UserListParams, db: Session):
     """Get standard users - accessible by admin and super admin"""
-    return get_users_by_role(current_user, "standard_user", db)
+    return get_users_by_role(current_user, "standard_user", params, db)
 
-def get_all_users_for_super_admin(current_user: User, db: Session):
+def get_all_users_for_super_admin(current_user: User, params: UserListParams, db: Session):
     """Get all users - only accessible by super admin"""
-    return get_users_by_role(current_user, "all", db)
+    return get_users_by_role(current_user, "all", params, db)
 
-def get_admins_for_super_admin(current_user: User, db: Session):
+def get_admins_for_super_admin(current_user: User, params: UserListParams, db: Session):
     """Get all admin users - only accessible by super admin"""
-    return get_users_by_role(current_user, "admin", db)
+    return get_users_by_role(current_user, "admin", params, db)
 
 def deactivate_user(user_id: int, current_user: User, db: Session):
     """Deactivate a user"""
@@ -274,25 +368,16 @@ def deactivate_user(user_id: int, current_user: User, db: Session):
         raise HTTPException(status_code=404, detail="User not found")
     
     # Role-based restrictions
-    current_role = current_user.role.name
-    target_role = user.role.name
-    
-    # Prevent self-deactivation
-    if user.id == current_user.id:
-        raise HTTPException(status_code=400, detail="Cannot deactivate yourself")
-    
-    # Admin cannot deactivate other admins or super_admins
-    if current_role == "admin" and target_role in ["admin", "super_admin"]:
-        raise HTTPException(status_code=403, detail="Cannot deactivate admin or super_admin users")
-    
-    # Super admin cannot deactivate other super_admins
-    if current_role == "super_admin" and target_role == "super_admin":
-        raise HTTPException(status_code=403, detail="Cannot deactivate other super_admin users")
+    denied = _check_status_action("deactivate", current_user, user)
+    if denied:
+        raise HTTPException(status_code=denied[0], detail=denied[1])
     
+    track_user_change(db, user.role_id, user.is_active, user.role_id, False)
     user.is_active = False
     db.commit()
+    invalidate_user(user.id)
     db.refresh(user)
-    logger.info(f"User {current_user.email} deactivated user {user.email}")
+    logger.info("User %s deactivated user %s", current_user.email, user.email)
     
     return _create_user_response(user)
 
@@ -303,22 +388,22 @@ def activate_user(user_id: int, current_user: User, db: Session):
         raise HTTPException(status_code=404, detail="User not found")
     
     # Role-based restrictions (similar to deactivate)
-    current_role = current_user.role.name
-    target_role = user.role.name
-    
-    if current_role == "admin" and target_role in ["admin", "super_admin"]:
-        raise HTTPException(status_code=403, detail="Cannot activate admin or super_admin users")
+    denied = _check_status_action("activate", current_user, user)
+    if denied:
+        raise HTTPException(status_code=denied[0], detail=denied[1])
     
+    track_user_change(db, user.role_id, user.is_active, user.role_id, True)
     user.is_active = True
     db.commit()
+    invalidate_user(user.id)
     db.refresh(user)
-    logger.info(f"User {current_user.email} activated user {user.email}")
+    logger.info("User %s activated user %s", current_user.email, user.email)
     
     return _create_user_response(user)
 
-def reset_user_password(user_id: int, new_password: str, current_user: User, db: Session):
+async def reset_user_password(user_id: int, new_password: str, current_user: User, db: Session):
     """Reset user password"""
-    user = db.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
+    user = await asyncio.to_thread(_get_user_with_role, db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -334,71 +419,123 @@ def reset_user_password(user_id: int, new_password: str, current_user: User, db:
     if current_role == "admin" and target_role in ["admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Cannot reset password for admin or super_admin users")
     
-    user.hashed_password = hash_password(new_password)
+    hashed_password = await hash_password_async(new_password)
+    response = await asyncio.to_thread(_save_password, db, user, hashed_password)
+    logger.info("User %s reset password for user %s", current_user.email, user.email)
+    
+    return response
+
+def _get_user_with_role(db: Session, user_id: int):
+    return db.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
+
+def _save_password(db: Session, user: User, hashed_password: str) -> dict:
+    user.hashed_password = hashed_password
     db.commit()
+    invalidate_user(user.id)
     db.refresh(user)
-    logger.info(f"User {current_user.email} reset password for user {user.email}")
-    
     return _create_user_response(user)
 
+def _check_status_action(action: str, current_user: User, target_user: User):
+    """Return (status_code, detail) if current_user may not apply action to target_user, else None"""
+    current_role = current_user.role.name
+    target_role = target_user.role.name if target_user.role else None
+
+    # Prevent acting on yourself (activating yourself is harmless)
+    if action != "activate" and target_user.id == current_user.id:
+        return 400, f"Cannot {action} yourself"
+
+    # Admin cannot act on other admins or super_admins
+    if current_role == "admin" and target_role in ["admin", "super_admin"]:
+        return 403, f"Cannot {action} admin or super_admin users"
+
+    # Super admin cannot deactivate or delete other super_admins
+    if action != "activate" and current_role == "super_admin" and target_role == "super_admin":
+        return 403, f"Cannot {action} other super_admin users"
+
+    return None
+
+# Keeps each IN (...) list well under SQLite's bound-parameter limit
+BULK_CHUNK_SIZE = 500
+
 def bulk_user_action(user_ids: List[int], action: str, current_user: User, db: Session):
-    """Perform bulk actions on users"""
-    results = []
-    
-    for user_id in user_ids:
-        try:
-            if action == "activate":
-                result = activate_user(user_id, current_user, db)
-            elif action == "deactivate":
-                result = deactivate_user(user_id, current_user, db)
-            else:
-                raise HTTPException(status_code=400, detail="Invalid action")
-            
-            results.append(result)
-        except HTTPException as e:
-            logger.error(f"Bulk action failed for user {user_id}: {e.detail}")
+    """Perform a bulk activate/deactivate/delete in one transaction with per-id outcomes"""
+    if action not in ("activate", "deactivate", "delete"):
+        raise HTTPException(status_code=400, detail="Invalid action")
+
+    ordered_ids = list(dict.fromkeys(user_ids))
+
+    # Load every target (with its role) in a handful of IN queries
+    targets = {}
+    for start in range(0, len(ordered_ids), BULK_CHUNK_SIZE):
+        chunk = ordered_ids[start:start + BULK_CHUNK_SIZE]
+        for user in db.query(User).options(joinedload(User.role)).filter(User.id.in_(chunk)).all():
+            targets[user.id] = user
+
+    # Evaluate permissions in memory
+    results = {}
+    allowed = []
+    for user_id in ordered_ids:
+        user = targets.get(user_id)
+        if user is None:
+            results[user_id] = {"user_id": user_id, "success": False, "status_code": 404, "detail": "User not found"}
             continue
-    
-    return results
+        denied = _check_status_action(action, current_user, user)
+        if denied:
+            results[user_id] = {"user_id": user_id, "success": False, "status_code": denied[0], "detail": denied[1]}
+            continue
+        allowed.append(user)
 
-def get_admin_dashboard(current_user: User, db: Session):
-    """Get dashboard statistics for admin"""
+    # Keep the dashboard counters in step with the rows we are about to change
+    for user in allowed:
+        if action == "delete":
+            adjust_user_counter(db, user.role_id, user.is_active, -1)
+        else:
+            track_user_change(db, user.role_id, user.is_active, user.role_id, action == "activate")
+
+    # Build responses before commit expires the loaded instances
+    responses = {}
+    for user in allowed:
+        if action != "delete":
+            responses[user.id] = _create_user_response(user)
+            responses[user.id]["is_active"] = action == "activate"
+
+    allowed_ids = [user.id for user in allowed]
+    try:
+        for start in range(0, len(allowed_ids), BULK_CHUNK_SIZE):
+            chunk = allowed_ids[start:start + BULK_CHUNK_SIZE]
+            query = db.query(User).filter(User.id.in_(chunk))
+            if action == "delete":
+                query.delete(synchronize_session=False)
+            else:
+                query.update({User.is_active: action == "activate"}, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Bulk {action} by {current_user.email} failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Bulk {action} failed; no users were changed")
+
+    for user_id in allowed_ids:
+        invalidate_user(user_id)
+        results[user_id] = {"user_id": user_id, "success": True, "status_code": 200, "detail": None, "user": responses.get(user_id)}
+
+    failed = len(ordered_ids) - len(allowed)
+    logger.info("User %s bulk %s: %s succeeded, %s failed", current_user.email, action, len(allowed), failed)
+    return {
+        "action": action,
+        "succeeded": len(allowed),
+        "failed": failed,
+        "results": [results[user_id] for user_id in ordered_ids]
+    }
+
+async def get_admin_dashboard_async(current_user: User, db: AsyncSession):
+    """Get dashboard statistics for admin without leaving the event loop"""
     current_role = current_user.role.name
-    
-    if current_role == "admin":
-        # Admin can only see standard users
-        total_users = db.query(User).join(Role).filter(Role.name == "standard_user").count()
-        active_users = db.query(User).join(Role).filter(Role.name == "standard_user", User.is_active == True).count()
-        inactive_users = total_users - active_users
-        
-        return {
-            "total_users": total_users,
-            "active_users": active_users,
-            "inactive_users": inactive_users,
-            "user_type": "standard_users_only"
-        }
-    
-    elif current_role == "super_admin":
-        # Super admin can see all users
-        total_users = db.query(User).count()
-        active_users = db.query(User).filter(User.is_active == True).count()
-        inactive_users = total_users - active_users
-        
-        total_admins = db.query(User).join(Role).filter(Role.name == "admin").count()
-        total_standard = db.query(User).join(Role).filter(Role.name == "standard_user").count()
-        
-        return {
-            "total_users": total_users,
-            "active_users": active_users,
-            "inactive_users": inactive_users,
-            "total_admins": total_admins,
-            "total_standard_users": total_standard,
-            "user_type": "all_users"
-        }
-    
-    else:
+
+    if current_role not in ("admin", "super_admin"):
         raise HTTPException(status_code=403, detail="Access denied")
 
+    return build_dashboard(current_role, await get_user_counts_async(db))
+
 def _create_user_response(user: User) -> dict:
     """Helper function to create consistent user response"""
     return {
@@ -410,5 +547,6 @@ def _create_user_response(user: User) -> dict:
         "address": user.address,
         "is_active": user.is_active,
         "profile_pic": user.profile_pic,
+        "profile_pic_variants": variant_urls(user.profile_pic),
         "role": user.role.name if user.role else None
     }
\ No newline at end of file
@@ -1,10 +1,14 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session, joinedload
-from app.dbconfig.database import SessionLocal
+from app.dbconfig.database import SessionLocal, AsyncSessionLocal
 from app.models.user import User
+from app.schemas.user_schema import UserListParams
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.utils.validate_token import verify_token_credentials
 from app.utils.validators import validate_user_id
+from app.utils.user_cache import principal_cache, snapshot_user, attach_user
 from app.logger.logger import logger
 
 security = HTTPBearer()
@@ -15,15 +19,35 @@ def get_db():
         yield db
     except Exception as e:
         logger.error(f"An error occurred while Yielding the database: {e}")
+        raise
     finally:
         db.close()
 
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Async database support is not configured"
+        )
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"An error occurred while Yielding the async database: {e}")
+            raise
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
     decoded_token = verify_token_credentials(credentials)
 
     user_id_str = decoded_token.get("sub")
     user_id = validate_user_id(user_id_str)
-    
+
+    snapshot = principal_cache.get(user_id)
+    if snapshot is not None:
+        return attach_user(snapshot, db)
+
+    version = principal_cache.version(user_id)
     user = db.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
         
     if user is None:
@@ -32,7 +56,8 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"}
         )
-        
+
+    principal_cache.put(user_id, snapshot_user(user), version)
     return user
 
 def require_role(allowed_roles: list[str]):
@@ -45,5 +70,21 @@ def require_role(allowed_roles: list[str]):
         return current_user
     return role_checker
 
-
-    
\ No newline at end of file
+def get_user_list_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page"),
+    sort_by: str = Query("id", pattern="^(id|email|first_name|last_name)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    role: Optional[str] = Query(None, pattern="^(super_admin|admin|standard_user)$"),
+    is_active: Optional[bool] = Query(None),
+    q: Optional[str] = Query(None, max_length=100, description="Prefix of email, first name or last name")
+) -> UserListParams:
+    return UserListParams(
+        limit=limit,
+        cursor=cursor,
+        sort_by=sort_by,
+        order=order,
+        role=role,
+        is_active=is_active,
+        q=q
+    )
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import os
+import re
+from typing import Optional
+from uuid import uuid4
+from fastapi import HTTPException, UploadFile, status
+from app.utils.image_variants import delete_variants
+from app.logger.logger import logger
+
+PROFILE_PIC_DIR = os.path.join("static", "profile_pics")
+PROFILE_PIC_URL_PREFIX = "/static/profile_pics/"
+PROFILE_PIC_MAX_BYTES = int(os.getenv("PROFILE_PIC_MAX_BYTES", str(5 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+_ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+# Names given by save_upload_file: a per-upload id and the content digest
+_STORED_NAME = re.compile(r"^/static/profile_pics/[0-9a-f]{32}_([0-9a-f]{64})\.[a-z]+$")
+
+
+def _safe_extension(filename: Optional[str]) -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extension if extension in _ALLOWED_EXTENSIONS else ".jpg"
+
+
+async def save_upload_file(upload: UploadFile, directory: str = PROFILE_PIC_DIR,
+                           max_bytes: Optional[int] = None) -> str:
+    """Stream an upload to disk in fixed-size chunks and return the stored filename.
+
+    Bytes go to a temp file in the target directory and are renamed into place
+    only once the whole upload is within max_bytes, so readers never see a
+    partial image. Disk writes run in a worker thread to keep the loop free.
+    The SHA-256 of the content is appended to the name for the variant stage.
+    """
+    max_bytes = max_bytes or PROFILE_PIC_MAX_BYTES
+    os.makedirs(directory, exist_ok=True)
+    extension = _safe_extension(upload.filename)
+    temp_path = os.path.join(directory, f".{uuid4().hex}.part")
+
+    digest = hashlib.sha256()
+    written = 0
+    out = await asyncio.to_thread(open, temp_path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Image exceeds the maximum size of {max_bytes} bytes"
+                )
+            digest.update(chunk)
+            await asyncio.to_thread(out.write, chunk)
+        await asyncio.to_thread(out.close)
+        filename = f"{uuid4().hex}_{digest.hexdigest()}{extension}"
+        await asyncio.to_thread(os.replace, temp_path, os.path.join(directory, filename))
+    except BaseException:
+        out.close()
+        await asyncio.to_thread(_remove_quietly, temp_path)
+        raise
+    finally:
+        await upload.close()
+
+    return filename
+
+
+def _remove_quietly(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def stored_upload_digest(url_path: Optional[str]) -> Optional[str]:
+    """Content digest of a picture written by save_upload_file, or None for any other value"""
+    match = _STORED_NAME.match(url_path or "")
+    return match.group(1) if match else None
+
+
+def delete_profile_pic(url_path: Optional[str], remove_variants: bool = False) -> bool:
+    """Remove an uploaded profile picture, and optionally its thumbnails, given its /static URL.
+
+    Only names produced by save_upload_file are accepted; callers check that
+    no user still points at the picture (or, for variants, at its content).
+    """
+    digest = stored_upload_digest(url_path)
+    if digest is None:
+        return False
+    try:
+        removed = _remove_quietly(os.path.join(PROFILE_PIC_DIR, os.path.basename(url_path)))
+        if remove_variants:
+            delete_variants(digest)
+        return removed
+    except OSError as e:
+        logger.error(f"Error deleting profile picture {url_path}: {e}")
+        return False
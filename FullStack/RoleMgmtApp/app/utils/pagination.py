@@ -0,0 +1,35 @@
+import base64
+import json
+from typing import Optional
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(sort_by: str, order: str, last_value, last_id: int) -> str:
+    """Pack the position after the last row of a page into an opaque token"""
+    payload = json.dumps({"s": sort_by, "o": order, "v": last_value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], sort_by: str, order: str) -> Optional[dict]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = int(payload["id"])
+        last_value = payload["v"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # A cursor is only meaningful for the ordering it was issued under
+    if payload.get("s") != sort_by or payload.get("o") != order:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order")
+
+    return {"value": last_value, "id": last_id}
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import threading
+from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from app.utils.auth import hash_password, verify_password
+from app.logger.logger import logger
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Jobs allowed to wait for a worker before new requests are turned away
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", str(PASSWORD_HASH_WORKERS * 8)))
+# Passwords per pool job in hash_many; small batches let logins interleave with bulk work
+PASSWORD_HASH_BATCH_SIZE = int(os.getenv("PASSWORD_HASH_BATCH_SIZE", "8"))
+
+
+def _hash_batch(passwords: List[str]) -> List[str]:
+    return [hash_password(password) for password in passwords]
+
+
+class PasswordHashingExecutor:
+    """Runs bcrypt hash/verify on a bounded process pool.
+
+    At most `workers` jobs run at once; up to `max_queue` more may wait for a
+    slot. Beyond that callers get a 503 instead of piling onto the pool.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = asyncio.Semaphore(workers)
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                logger.info("Started password hashing pool with %s workers", self.workers)
+            return self._pool
+
+    async def _run(self, func, *args):
+        if self._slots.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def hash_many(self, passwords: List[str], batch_size: int = PASSWORD_HASH_BATCH_SIZE) -> List[str]:
+        """Hash a list of passwords across every worker, returning hashes in input order"""
+        batches = [passwords[i:i + batch_size] for i in range(0, len(passwords), batch_size)]
+        # At most one batch per worker is queued, so bulk work never trips the 503 guard
+        limit = asyncio.Semaphore(self.workers)
+
+        async def run_batch(batch):
+            async with limit:
+                return await self._run(_hash_batch, batch)
+
+        results = await asyncio.gather(*(run_batch(batch) for batch in batches))
+        return [hashed for batch in results for hashed in batch]
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+password_executor = PasswordHashingExecutor()
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_executor.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.verify(plain_password, hashed_password)
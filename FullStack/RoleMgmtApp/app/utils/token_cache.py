@@ -0,0 +1,71 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+# Upper bound on how long a token without an exp claim stays cached
+TOKEN_CACHE_MAX_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_MAX_TTL_SECONDS", "300"))
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of tokens whose signature and claims were already verified.
+
+    Keys are SHA-256 digests, so raw bearer tokens are never held in memory
+    here. Each entry expires at the token's own `exp`.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES, max_ttl: int = TOKEN_CACHE_MAX_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return dict(claims)
+
+    def put(self, token: str, claims: dict):
+        now = time.time()
+        expires_at = now + self.max_ttl
+        if claims.get("exp"):
+            expires_at = min(expires_at, float(claims["exp"]))
+        if expires_at <= now:
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (dict(claims), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = VerifiedTokenCache()
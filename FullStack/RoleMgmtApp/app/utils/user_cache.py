@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.models.user import User
+from app.models.role import Role
+
+# Invalidation only reaches the cache of the process that made the write. With
+# several workers, a user deactivated or demoted through one of them stays
+# authorized with their old role on the others until the entry expires, so this
+# bounds that window; use 0 to disable the cache where that is unacceptable.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "10"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+_USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+class PrincipalCache:
+    """TTL + LRU cache of authenticated users, keyed by the token's `sub`.
+
+    Entries are plain column snapshots (never live ORM objects) tagged with the
+    user's version at the time they were loaded. `invalidate` bumps the version,
+    so a snapshot read before a write can never be served after it by this
+    process; other worker processes rely on USER_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, max_entries: int = USER_CACHE_MAX_ENTRIES, ttl: float = USER_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, user_id: int) -> int:
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def get(self, user_id: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            snapshot, version, expires_at = entry
+            if expires_at < time.monotonic() or version != self._versions.get(user_id, 0):
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return snapshot
+
+    def put(self, user_id: int, snapshot: dict, version: int):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if version != self._versions.get(user_id, 0):
+                # The user changed while this snapshot was being loaded
+                return
+            self._entries[user_id] = (snapshot, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache()
+
+
+def snapshot_user(user: User) -> dict:
+    """Capture the loaded column values and role of a user"""
+    return {
+        "columns": {key: getattr(user, key) for key in _USER_COLUMNS},
+        "role": (user.role.id, user.role.name) if user.role else None,
+    }
+
+
+def attach_user(snapshot: dict, db: Session) -> User:
+    """Rebuild a session-bound User from a snapshot without emitting SQL"""
+    user = User(**snapshot["columns"])
+    if snapshot["role"]:
+        role_id, role_name = snapshot["role"]
+        role = Role(id=role_id, name=role_name)
+        make_transient_to_detached(role)
+        user.role = role
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def invalidate_user(user_id: int):
+    principal_cache.invalidate(user_id)
@@ -1,7 +1,8 @@
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
-import time
 from app.utils.auth import SECRET_KEY, ALGORITHM
+from app.utils.token_cache import token_cache
+from app.utils.password_policy import password_policy
 
 
 def validate_email(email: str) -> bool:
@@ -11,18 +12,9 @@ def validate_email(email: str) -> bool:
 
 
 def validate_password_strength(password: str) -> tuple[bool, str]:
-    if len(password) < 8:
-        return False, "Password must be at least 8 characters long"
-    
-    if not any(c.isupper() for c in password):
-        return False, "Password must contain at least one uppercase letter"
-    
-    if not any(c.islower() for c in password):
-        return False, "Password must contain at least one lowercase letter"
-    
-    if not any(c.isdigit() for c in password):
-        return False, "Password must contain at least one number"
-    
+    message = password_policy.check(password)
+    if message:
+        return False, message
     return True, "Password is valid"
 
 
@@ -34,18 +26,15 @@ def validate_jwt_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"}
         )
     
+    # Tokens verified earlier are served from the cache until their exp
+    cached_token = token_cache.get(token)
+    if cached_token is not None:
+        return cached_token
+
     try:
-        # Decode and validate the token
+        # Decode and validate the token (jwt.decode also rejects an expired exp)
         decoded_token = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         
-        # Check if token has expired (if exp claim exists)
-        if decoded_token.get('exp') and decoded_token['exp'] < time.time():
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has expired",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
-        
         # Validate required fields
         if not decoded_token.get('sub'):
             raise HTTPException(
@@ -54,8 +43,12 @@ def validate_jwt_token(token: str) -> dict:
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
+        token_cache.put(token, decoded_token)
         return decoded_token
         
+    except HTTPException:
+        raise
+
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -63,13 +56,6 @@ def validate_jwt_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    except jwt.InvalidTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,13 @@
+import API from './axios';
+
+// User list endpoints are paginated; follow next_cursor until every page is loaded
+export const fetchAllPages = async (url) => {
+  const users = [];
+  let cursor;
+  do {
+    const res = await API.get(url, { params: { limit: 200, cursor } });
+    users.push(...(res.data.users || []));
+    cursor = res.data.next_cursor || undefined;
+  } while (cursor);
+  return users;
+};
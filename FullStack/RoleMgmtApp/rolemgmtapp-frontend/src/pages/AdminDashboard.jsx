@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react';
 import API from '../api/axios';
+import { fetchAllPages } from '../api/users';
 import { useAuth } from '../auth/AuthContext';
 
 const AdminDashboard = () => {
@@ -9,8 +10,7 @@ const AdminDashboard = () => {
 
   const fetchUsers = async () => {
     try {
-      const res = await API.get('/users/admin/standard-users');
-      setUsers(res.data);
+      setUsers(await fetchAllPages('/users/admin/standard-users'));
     } catch (err) {
       setError('Failed to fetch users');
     }
@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react';
 import API from '../api/axios';
+import { fetchAllPages } from '../api/users';
 import { useAuth } from '../auth/AuthContext';
 
 const SuperAdminDashboard = () => {
@@ -31,8 +32,7 @@ const SuperAdminDashboard = () => {
   const fetchUsers = async () => {
     setLoading(true);
     try {
-      const res = await API.get('/users/superadmin/all-users');
-      setUsers(res.data);
+      setUsers(await fetchAllPages('/users/super-admin/all-users'));
       setError('');
     } catch (err) {
       setError('Failed to fetch users');
@@ -44,8 +44,7 @@ const SuperAdminDashboard = () => {
   const fetchAdmins = async () => {
     setLoading(true);
     try {
-      const res = await API.get('/users/superadmin/all-admins');
-      setAdmins(res.data);
+      setAdmins(await fetchAllPages('/users/super-admin/admins'));
       setError('');
     } catch (err) {
       setError('Failed to fetch admins');
@@ -5,20 +5,21 @@ from app.models.role_model import Role
 from app.schemas.user_schema import UserCreate
 from app.services.user_service import hash_password, verify_password
 from app.services.auth_service import create_access_token
+from app.services.role_registry import role_registry
 
 def register_user(user_data: UserCreate, db: Session):
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Use fixed role ID=2 for standard_user
-    standard_role = db.query(Role).filter(Role.id == 2).first()
-    if not standard_role:
+    # standard_user is seeded with ID=2; the registry answers without a query
+    standard_role_id = role_registry.id_for("standard_user")
+    if standard_role_id is None:
         # Create standard_user role with ID=2 if it doesn't exist
         standard_role = Role(id=2, name="standard_user")
         db.add(standard_role)
         db.commit()
-        db.refresh(standard_role)
+        standard_role_id = standard_role.id
 
     new_user = User(
         first_name=user_data.first_name,
@@ -27,7 +28,7 @@ def register_user(user_data: UserCreate, db: Session):
         password_hash=hash_password(user_data.password),
         contact_number=user_data.contact_number,
         address=user_data.address,
-        role_id=2  # Fixed ID for standard_user role
+        role_id=standard_role_id
     )
     db.add(new_user)
     db.commit()
@@ -1,11 +1,42 @@
 from sqlalchemy.orm import Session
 from app.models.user_model import User
 from app.models.role_model import Role
+from app.services.role_registry import role_registry
 from app.schemas.user_schema import UserUpdate
 from fastapi import HTTPException
 
-def get_all_users(db: Session):
-    return db.query(User).all()
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Exactly the UserOut fields; the role name comes from the same joined query
+USER_OUT_COLUMNS = (
+    User.id, User.first_name, User.last_name, User.email,
+    User.contact_number, User.address, User.profile_pic,
+)
+
+def user_out(user: User) -> dict:
+    """UserOut fields for a loaded user, resolving the role name without a lazy load"""
+    return {
+        "id": user.id,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "email": user.email,
+        "contact_number": user.contact_number,
+        "address": user.address,
+        "profile_pic": user.profile_pic,
+        "role": role_registry.name_for(user.role_id) or "standard_user",
+    }
+
+def get_all_users(db: Session, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0):
+    rows = (
+        db.query(*USER_OUT_COLUMNS, Role.name.label("role"))
+        .outerjoin(Role, User.role_id == Role.id)
+        .order_by(User.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return [{**row._asdict(), "role": row.role or "standard_user"} for row in rows]
 
 def update_user_profile(user_id: int, update_data: UserUpdate, db: Session):
     user = db.query(User).filter(User.id == user_id).first()
@@ -17,27 +48,23 @@ def update_user_profile(user_id: int, update_data: UserUpdate, db: Session):
 
     db.commit()
     db.refresh(user)
-    return user
+    return user_out(user)
 
 def assign_user_role(user_id: int, role_name: str, db: Session):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Only allow assignment of valid roles with fixed IDs
-    if role_name == "admin":
-        role_id = 1
-    elif role_name == "standard_user":
-        role_id = 2
-    else:
+    # Only allow assignment of the two fixed roles
+    if role_name not in ("admin", "standard_user"):
         raise HTTPException(status_code=400, detail="Invalid role. Only 'admin' or 'standard_user' allowed")
 
     # Verify the role exists in the database
-    role = db.query(Role).filter(Role.id == role_id).first()
+    role = role_registry.get_by_name(role_name)
     if not role:
         raise HTTPException(status_code=500, detail=f"Role {role_name} not found in database. Please initialize the database.")
 
-    user.role_id = role_id
+    user.role_id = role.id
     db.commit()
     db.refresh(user)
-    return user
+    return user_out(user)
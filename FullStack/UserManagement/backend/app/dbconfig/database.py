@@ -1,14 +1,12 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app.dbconfig.sqlite_profile import create_sqlite_engine
 import os
 
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./role_management.db")
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_sqlite_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
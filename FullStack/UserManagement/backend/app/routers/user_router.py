@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, Security, HTTPException
+from fastapi import APIRouter, Depends, Security, HTTPException, Query
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from app.dbconfig.database import get_db
 from app.controllers import user_controller
 from app.services.auth_service import get_current_user
+from app.services.role_registry import role_registry
 from app.schemas.user_schema import UserOut
 from pydantic import BaseModel
 
@@ -15,14 +16,16 @@ security = HTTPBearer()
 
 @router.get("/", response_model=list[UserOut])
 def list_users(
+    limit: int = Query(user_controller.DEFAULT_PAGE_SIZE, ge=1, le=user_controller.MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user),
     token: str = Security(security)
 ):
     # Admin-only check
-    if not current_user.role or current_user.role.name != "admin":
+    if role_registry.name_for(current_user.role_id) != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
-    return user_controller.get_all_users(db)
+    return user_controller.get_all_users(db, limit, offset)
 
 @router.put("/{user_id}/role", response_model=UserOut)
 def update_user_role(
@@ -33,6 +36,6 @@ def update_user_role(
     token: str = Security(security)
 ):
     # Admin-only check
-    if not current_user.role or current_user.role.name != "admin":
+    if role_registry.name_for(current_user.role_id) != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return user_controller.assign_user_role(user_id, role_data.role_name, db)
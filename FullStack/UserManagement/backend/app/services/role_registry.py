@@ -0,0 +1,103 @@
+import threading
+from typing import Dict, FrozenSet, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models.role_model import Role
+
+# Permissions granted to each role, mirroring the route guards
+ROLE_PERMISSIONS: Dict[str, FrozenSet[str]] = {
+    "admin": frozenset({"users:view", "users:manage", "roles:assign"}),
+    "standard_user": frozenset(),
+}
+
+
+class RoleEntry(NamedTuple):
+    id: int
+    name: str
+    permissions: FrozenSet[str]
+
+
+class RoleRegistry:
+    """In-process id <-> name map of the roles table.
+
+    Loaded on first use and reloaded lazily after any Role insert, update or
+    delete is committed through the ORM, so lookups never hit the database
+    on the request path.
+    """
+
+    def __init__(self, permissions: Dict[str, FrozenSet[str]] = ROLE_PERMISSIONS):
+        self._permissions = permissions
+        self._by_id: Dict[int, RoleEntry] = {}
+        self._by_name: Dict[str, RoleEntry] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> int:
+        entries = [
+            RoleEntry(role_id, name, self._permissions.get(name, frozenset()))
+            for role_id, name in db.query(Role.id, Role.name).all()
+        ]
+        with self._lock:
+            self._by_id = {entry.id: entry for entry in entries}
+            self._by_name = {entry.name: entry for entry in entries}
+            self._loaded = True
+        return len(entries)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        from app.dbconfig.database import SessionLocal
+        db = SessionLocal()
+        try:
+            self.load(db)
+        finally:
+            db.close()
+
+    def get_by_name(self, name: Optional[str]) -> Optional[RoleEntry]:
+        self._ensure_loaded()
+        return self._by_name.get(name)
+
+    def get_by_id(self, role_id: Optional[int]) -> Optional[RoleEntry]:
+        self._ensure_loaded()
+        return self._by_id.get(role_id)
+
+    def id_for(self, name: Optional[str]) -> Optional[int]:
+        entry = self.get_by_name(name)
+        return entry.id if entry else None
+
+    def name_for(self, role_id: Optional[int]) -> Optional[str]:
+        entry = self.get_by_id(role_id)
+        return entry.name if entry else None
+
+    def has_permission(self, role_name: Optional[str], permission: str) -> bool:
+        entry = self.get_by_name(role_name)
+        return entry is not None and permission in entry.permissions
+
+
+role_registry = RoleRegistry()
+
+
+def _mark_roles_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["roles_changed"] = True
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Role, _event_name, _mark_roles_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _reload_roles_after_commit(session):
+    # Invalidate only once the change is visible to other sessions
+    if session.info.pop("roles_changed", False):
+        role_registry.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_role_changes(session):
+    session.info.pop("roles_changed", None)
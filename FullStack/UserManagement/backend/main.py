@@ -3,9 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 
 from app.routers import auth_router, user_router
-from app.dbconfig.database import engine, Base, get_db
+from app.dbconfig.database import engine, Base, get_db, SessionLocal
+from app.dbconfig.query_profiler import QueryProfilerMiddleware, instrument_engine
 from app.models import user_model, role_model  # Import models to register them
 from app.services.auth_service import get_current_user
+from app.services.role_registry import role_registry
 from app.schemas.user_schema import UserOut, UserUpdate
 from app.controllers import user_controller
 from sqlalchemy.orm import Session
@@ -13,12 +15,26 @@ from sqlalchemy.orm import Session
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Load roles once so requests never pay for the registry's first lookup
+with SessionLocal() as db:
+    role_registry.load(db)
+
 app = FastAPI(
     title="Role Management API",
     description="A role-based authentication system with JWT and FastAPI",
     version="1.0.0"
 )
 
+instrument_engine(engine)
+
+# Per-route SQL query budgets; exceeding one is logged, or raised with QUERY_BUDGET_STRICT=true
+QUERY_BUDGETS = {
+    "GET /me": 1,
+    "GET /users/": 2,
+}
+
+app.add_middleware(QueryProfilerMiddleware, budgets=QUERY_BUDGETS)
+
 # CORS configuration (adjust origins as needed)
 app.add_middleware(
     CORSMiddleware,
@@ -36,16 +52,7 @@ def get_current_user_profile(
     current_user = Depends(get_current_user),
     token: str = Security(security)
 ):
-    return {
-        "id": current_user.id,
-        "first_name": current_user.first_name,
-        "last_name": current_user.last_name,
-        "email": current_user.email,
-        "contact_number": current_user.contact_number,
-        "address": current_user.address,
-        "profile_pic": current_user.profile_pic,
-        "role": current_user.role.name if current_user.role else "standard_user"
-    }
+    return user_controller.user_out(current_user)
 
 @app.put("/profile", response_model=UserOut)
 def update_user_profile(
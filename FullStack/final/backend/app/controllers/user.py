@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request, Response
 from app.dbconfig.database import SessionLocal, engine, Base, get_db
 from sqlalchemy.orm import Session
 from app.schemas.user import UserRead, UserCreate, UserPartialUpdate, UserProfileResponse, UserUpdateResponse, UsersListResponse, RoleUpdateResponse, RoleUpdateRequest
 from app.models.user import User
 from app.utils.dependencies import get_current_user, require_admin
 from app.services.user_service import create_user, get_me, update_profile, list_all_users, update_user_role, update_user
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.logger.logger import logger
 
 router = APIRouter()
@@ -22,8 +24,22 @@ def update_my_profile(
     return update_profile(db, current_user, user_update)
 
 @router.get("/list", response_model=UsersListResponse)
-def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(require_admin)):
-    return list_all_users(db)
+def get_all_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    page, etag = list_all_users(db, limit, offset, cursor, request.headers.get("if-none-match"))
+    # no-cache lets the browser keep the page but revalidate it on every load
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if page is None:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return page
 
 @router.put("/{user_id}/role", response_model=RoleUpdateResponse)
 def update_user_role_endpoint(
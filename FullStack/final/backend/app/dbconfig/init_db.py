@@ -1,5 +1,6 @@
 from app.dbconfig.database import SessionLocal
 from app.models.role import Role
+from app.utils.role_registry import role_registry
 
 def seed_roles():
     db = SessionLocal()
@@ -10,6 +11,7 @@ def seed_roles():
             Role(id = 2, name="user"),
         ])
     db.commit()
+    role_registry.load(db)
     db.close()
 
 if __name__ == "__main__":
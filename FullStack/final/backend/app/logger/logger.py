@@ -1,9 +1,106 @@
 # app/logger/logger.py
+import atexit
+import json
 import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
 
+# Records are put on a bounded queue by the calling thread and formatted and
+# written by a single listener thread, so a request never waits on log I/O.
+# Pass arguments %-style (logger.info("User %s", email)) so the message is
+# only built on the listener thread, and only for records that are kept.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json: one object per line for log shippers; text: the classic console format
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# When the queue is full new records are dropped (and counted) instead of blocking
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Fraction of INFO and DEBUG records kept; warnings and errors are never sampled
+LOG_INFO_SAMPLE_RATE = float(os.getenv("LOG_INFO_SAMPLE_RATE", "1.0"))
 
-def configure_logging(level=logging.INFO):
-    logging.basicConfig(level=level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.INFO or random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the listener thread without formatting them or ever blocking"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener runs in this process, so the record can travel as is
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+queue_handler = None
+_listener = None
+
+
+def configure_logging(level=LOG_LEVEL):
+    global queue_handler, _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    # Like basicConfig, leave an already configured root logger alone
+    if root.handlers:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    if LOG_INFO_SAMPLE_RATE < 1:
+        queue_handler.addFilter(SamplingFilter(LOG_INFO_SAMPLE_RATE))
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Write out everything still queued and stop the listener thread"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    if queue_handler.dropped:
+        sys.stderr.write(f"{queue_handler.dropped} log records were dropped because the log queue was full\n")
+
+
+def dropped_log_records() -> int:
+    return queue_handler.dropped if queue_handler else 0
 
 
 class Logger:
@@ -14,7 +111,7 @@ class Logger:
 
 
 # Configure logger at the start of your application
-configure_logging(logging.INFO)  # Set to INFO to capture INFO and ERROR logs
+configure_logging()  # LOG_LEVEL defaults to INFO to capture INFO and ERROR logs
 
 # Default logger instance for the module
-logger = Logger.get_logger(__name__)
\ No newline at end of file
+logger = Logger.get_logger(__name__)
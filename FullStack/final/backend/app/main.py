@@ -1,12 +1,17 @@
 from fastapi import FastAPI
 from app.dbconfig.database import engine, Base
+from app.dbconfig.query_profiler import QueryProfilerMiddleware, instrument_engine
 from app.models.user import User
 from app.models.role import Role  # Import Role model
 from app.routers.base_router import router
+from app.utils.metrics import MetricsMiddleware, metrics, metrics_endpoint, instrument_pool
+from app.logger.logger import dropped_log_records
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI()
 
+instrument_engine(engine)
+
 Base.metadata.create_all(bind=engine)
 
 # Seed roles after creating tables
@@ -25,4 +30,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
+
+# Per-route SQL query budgets; exceeding one is logged, or raised with QUERY_BUDGET_STRICT=true
+QUERY_BUDGETS = {
+    "GET /users/list": 3,
+}
+
+app.add_middleware(QueryProfilerMiddleware, budgets=QUERY_BUDGETS)
+
+# Runtime metrics in Prometheus text format at /metrics
+instrument_pool(engine)
+metrics.gauge("log_records_dropped_total", "Log records dropped because the log queue was full",
+              dropped_log_records, metric_type="counter")
+
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+app.add_middleware(MetricsMiddleware)
@@ -74,6 +74,9 @@ class UsersListResponse(BaseModel):
     message: str
     users: list[UserListResponse]
     total_count: int
+    limit: int
+    offset: int = 0
+    next_cursor: Optional[str] = None
 
 class RoleUpdateResponse(BaseModel):
     message: str
@@ -25,7 +25,7 @@ def signup_user(db: Session, user_data: SignupRequest):
         role_id=user_data.role_id,
         is_active=True
     )
-    logger.info(f"Registering new user: {new_user.email}")
+    logger.info("Registering new user: %s", new_user.email)
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
@@ -49,6 +49,6 @@ def login_user(db: Session, login_data: LoginRequest):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is inactive"
         )
-    logger.info(f"User {user.email} logged in successfully")
+    logger.info("User %s logged in successfully", user.email)
     access_token = create_access_token(data={"sub":user.email, "role_id": user.role_id})
     return TokenResponse(access_token=access_token, token_type="bearer")
\ No newline at end of file
@@ -1,10 +1,14 @@
+from typing import Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 from app.schemas.user import UserBase, UserCreate, UserPartialUpdate, UserProfileResponse, UserUpdateResponse, UsersListResponse, UserListResponse, RoleUpdateResponse
 from app.models.user import User
 from app.models.role import Role
 from app.utils.auth import hash_password
+from app.utils.role_registry import role_registry
+from app.utils.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor, compute_etag, etag_matches
 from fastapi import HTTPException, status
-import app.logger.logger as logger
+from app.logger.logger import logger
 
 def get_me(user: User):
     return UserProfileResponse(
@@ -21,7 +25,7 @@ def update_profile(db: Session, user: User, user_update: UserPartialUpdate):
     db.commit()
     db.refresh(user)
 
-    logger.info(f"User {user.email} profile updated successfully")
+    logger.info("User %s profile updated successfully", user.email)
     return UserUpdateResponse(
         message="Profile updated successfully",
         user=user
@@ -29,7 +33,7 @@ def update_profile(db: Session, user: User, user_update: UserPartialUpdate):
 
 def create_user(db: Session, user_create: UserCreate):
     # Validate role exists
-    role = db.query(Role).filter(Role.id == user_create.role_id).first()
+    role = role_registry.get_by_id(user_create.role_id)
     if not role:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,7 +58,7 @@ def create_user(db: Session, user_create: UserCreate):
     db.commit()
     db.refresh(new_user)
 
-    logger.info(f"User {new_user.email} created successfully")
+    logger.info("User %s created successfully", new_user.email)
     return UserProfileResponse(
         message="User created successfully",
         user=new_user
@@ -74,21 +78,69 @@ def update_user(db: Session, user_id: int, user_update: UserPartialUpdate):
     db.commit()
     db.refresh(user)
 
-    logger.info(f"User {user.email} updated successfully")
+    logger.info("User %s updated successfully", user.email)
     return UserUpdateResponse(
         message="User updated successfully",
         user=user
     )   
 
-def list_all_users(db: Session):
-    users = db.query(User).options(joinedload(User.role)).all()
+def list_all_users(db: Session, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0,
+                   cursor: Optional[str] = None, if_none_match: Optional[str] = None):
+    """
+    Return one page of users ordered by id, plus the page's ETag.
+    A cursor (keyset) takes precedence over offset. The page is None when
+    if_none_match shows the client already has this exact page.
+    """
+    after_id = decode_cursor(cursor)
+
+    # Plain column rows; no ORM objects are built for the listing
+    query = (
+        db.query(
+            User.id, User.first_name, User.last_name, User.email, User.contact_number,
+            User.address, User.profile_pic, User.is_active,
+            Role.id.label("role_id"), Role.name.label("role_name")
+        )
+        .outerjoin(Role, User.role_id == Role.id)
+        .order_by(User.id)
+    )
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+    elif offset:
+        query = query.offset(offset)
+
+    # One extra row tells us whether another page follows
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    rows = rows[:limit]
+    total_count = db.query(func.count(User.id)).scalar()
+
+    etag = compute_etag(total_count, next_cursor, [tuple(row) for row in rows])
+    if etag_matches(etag, if_none_match):
+        return None, etag
+
+    users = []
+    for row in rows:
+        user = row._asdict()
+        role_id, role_name = user.pop("role_id"), user.pop("role_name")
+        user["role"] = {"id": role_id, "name": role_name} if role_id is not None else None
+        users.append(UserListResponse.model_validate(user))
+
     return UsersListResponse(
         message="Users retrieved successfully",
-        users=[UserListResponse.model_validate(user) for user in users],
-        total_count=len(users)
-    )
+        users=users,
+        total_count=total_count,
+        limit=limit,
+        offset=offset if after_id is None else 0,
+        next_cursor=next_cursor
+    ), etag
 
 def update_user_role(db: Session, user_id: int, role_id: int):
+    if role_registry.get_by_id(role_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Role with id {role_id} does not exist"
+        )
+
     user = db.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
@@ -100,7 +152,7 @@ def update_user_role(db: Session, user_id: int, role_id: int):
     db.commit()
     db.refresh(user)
 
-    logger.info(f"User {user.email} role updated successfully")
+    logger.info("User %s role updated successfully", user.email)
     return RoleUpdateResponse(
         message="User role updated successfully",
         user=user
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session, joinedload
 from app.utils.auth import SECRET_KEY, ALGORITHM
 from app.dbconfig.database import SessionLocal, get_db
 from app.models.user import User
+from app.utils.role_registry import role_registry
 
 security = HTTPBearer()
 
@@ -26,7 +27,7 @@ def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     
 def require_admin(user: User = Depends(get_current_user)):
-    if user.role_id != 1:  # Assuming role_id 1 is for admin
+    if not role_registry.has_permission(role_registry.name_for(user.role_id), "users:manage"):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
     return user
 
@@ -0,0 +1,13 @@
+import axios from './axios';
+
+// /users/list is paginated; follow next_cursor until every page is loaded
+export const fetchAllUsers = async () => {
+    const users = [];
+    let cursor;
+    do {
+        const response = await axios.get('/users/list', { params: { limit: 200, cursor } });
+        users.push(...(response.data.users || []));
+        cursor = response.data.next_cursor || undefined;
+    } while (cursor);
+    return users;
+};
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import axios from '../api/axios';
+import { fetchAllUsers } from '../api/users';
 import { colors } from '../utils/colors';
 import Button from '@mui/material/Button';
 import Dialog from '@mui/material/Dialog';
@@ -52,8 +53,7 @@ function AdminPanel() {
     const fetchUsers = async () => {
         try {
             setLoading(true);
-            const response = await axios.get('/users/list');
-            setUsers(response.data.users || []);
+            setUsers(await fetchAllUsers());
             setError(''); // Clear any previous errors
         } catch (error) {
             setError('Failed to fetch users');